@@ -0,0 +1,84 @@
+from django.db import router
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import User
+
+from .cache import bump_version, get_version
+
+CLAIM_FIELDS = ('username', 'role', 'is_staff', 'is_active')
+VERSION_CLAIM = 'claims_version'
+
+
+def claims_key(user_id):
+    return f'user-claims:{user_id}'
+
+
+def get_claims_version(user_id):
+    """Поколение данных пользователя в токенах из общего для воркеров
+    хранилища поколений (api.cache)."""
+    return get_version(claims_key(user_id))
+
+
+def revoke_claims(user_id, using=None):
+    """Выданные ранее токены пользователя теряют быстрый путь во всех
+    воркерах: пользователь снова загружается из базы. Поколение
+    сдвигается после фиксации изменения пользователя."""
+    bump_version(claims_key(user_id), using=using)
+
+
+class ClaimsAccessToken(AccessToken):
+    """Токен доступа с полями пользователя, нужными для проверки прав."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        token[VERSION_CLAIM] = get_claims_version(user.pk)
+        return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """Собирает request.user из полей токена без запроса к базе.
+
+    Пользователь - экземпляр User, у которого загружены только id и
+    CLAIM_FIELDS; остальные поля загружаются из базы одним запросом
+    при первом обращении. Быстрый путь работает, пока поколение
+    пользователя в общем файле VERSIONS_DB совпадает с поколением
+    в токене: любое изменение пользователя сдвигает его (api.signals)
+    сразу для всех воркеров. Токены без
+    полей и устаревшие токены проверяются как в JWTAuthentication.
+    """
+
+    def get_user(self, validated_token):
+        user = self.get_claims_user(validated_token)
+        if user is None:
+            return super().get_user(validated_token)
+        return user
+
+    def get_claims_user(self, validated_token):
+        version = validated_token.get(VERSION_CLAIM)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if version is None or user_id is None:
+            return None
+        if get_claims_version(user_id) != version:
+            return None
+        claims = {api_settings.USER_ID_FIELD: user_id}
+        for field in CLAIM_FIELDS:
+            if field not in validated_token:
+                return None
+            claims[field] = validated_token[field]
+        if not claims['is_active']:
+            return None
+        # from_db ждёт значения в порядке полей модели.
+        fields = [
+            field.attname for field in User._meta.concrete_fields
+            if field.attname in claims
+        ]
+        return User.from_db(
+            router.db_for_read(User),
+            fields,
+            [claims[field] for field in fields],
+        )
@@ -0,0 +1,229 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.response import Response
+
+from .metrics import store
+from .routers import use_primary
+from .shared import SharedSQLite
+
+CACHE_PREFIX = 'api-response'
+HITS = 'api_response_cache_hits_total'
+MISSES = 'api_response_cache_misses_total'
+
+store.add_counter(HITS, 'Ответы из кэша анонимных запросов.')
+store.add_counter(MISSES, 'Промахи кэша анонимных запросов.')
+
+
+GENERATION_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS generation (
+    namespace TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    changed REAL NOT NULL
+) WITHOUT ROWID
+'''
+
+BUMP = '''
+INSERT INTO generation (namespace, version, changed) VALUES (?, ?, ?)
+ON CONFLICT (namespace) DO UPDATE SET
+    version = version + 1,
+    changed = excluded.changed
+'''
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+class GenerationStore(SharedSQLite):
+    """Поколения наборов данных и время их изменения в файле
+    VERSIONS_DB, общем для всех воркеров: запись в одном воркере
+    сразу видна остальным, хотя сами ответы кэшируются в кэше API,
+    который может быть у каждого процесса своим."""
+    setting = 'VERSIONS_DB'
+    schema = (GENERATION_SCHEMA,)
+
+    def get(self, namespace):
+        connection = self.connect()
+        select = 'SELECT version, changed FROM generation WHERE namespace = ?'
+        row = connection.execute(select, (namespace,)).fetchone()
+        if row is None:
+            # Начальное поколение берётся из времени, чтобы после
+            # удаления файла старые ответы не совпали с новыми ключами.
+            # Время изменения неизвестно: считаем, что данные только что
+            # изменились, клиенты получат полный ответ.
+            connection.execute(
+                'INSERT INTO generation (namespace, version, changed) '
+                'VALUES (?, ?, ?) ON CONFLICT (namespace) DO NOTHING',
+                (namespace, time.time_ns(), time.time()))
+            row = connection.execute(select, (namespace,)).fetchone()
+        return row
+
+    def bump(self, namespaces):
+        now = time.time()
+        self.connect().executemany(
+            BUMP, [(namespace, time.time_ns(), now)
+                   for namespace in namespaces])
+
+
+generations = GenerationStore()
+
+
+def get_version(namespace):
+    """Текущее поколение кэша для набора данных namespace."""
+    return generations.get(namespace)[0]
+
+
+def get_last_change(namespace):
+    """Поколение набора данных namespace и время его изменения."""
+    return generations.get(namespace)
+
+
+def bump_version(*namespaces, using=None):
+    """Инвалидирует все закэшированные ответы наборов namespaces.
+
+    Поколение сдвигается после фиксации транзакции: иначе параллельный
+    запрос мог бы закэшировать ещё старые данные под новым поколением.
+    """
+    transaction.on_commit(lambda: generations.bump(namespaces), using=using)
+
+
+def cache_stats():
+    """Число попаданий и промахов кэша ответов по всем воркерам."""
+    totals = store.counter_totals()
+    return {'hits': totals[HITS], 'misses': totals[MISSES]}
+
+
+def may_lag(changed, now):
+    """Данные прочитаны с реплики вскоре после изменения в момент
+    changed: реплика могла его ещё не получить."""
+    return (bool(settings.DATABASE_REPLICAS) and not use_primary.get()
+            and now - changed < settings.REPLICA_PIN_SECONDS)
+
+
+class AnonymousCacheMixin:
+    """Кэширует ответы на GET-запросы анонимных пользователей.
+
+    Ключ строится из версии API, поколения набора данных cache_namespace
+    и полного пути запроса вместе с параметрами и номером страницы.
+    Поколение сдвигается сигналами при изменении данных (api.signals).
+    Ответ, прочитанный с реплики вскоре после изменения, не кэшируется:
+    иначе старые данные остались бы под новым поколением.
+    """
+    cache_namespace = None
+
+    def get_cache_key(self, request, version):
+        path = hashlib.md5(
+            request.get_full_path().encode('utf-8')).hexdigest()
+        return ':'.join((
+            CACHE_PREFIX,
+            str(request.version),
+            self.cache_namespace,
+            str(version),
+            path,
+        ))
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        cache = get_cache()
+        version, changed = get_last_change(self.cache_namespace)
+        key = self.get_cache_key(request, version)
+        data = cache.get(key)
+        if data is not None:
+            store.increment(HITS)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+        store.increment(MISSES)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200 and not may_lag(changed, time.time()):
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(AnonymousCacheMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(AnonymousCacheMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalMixin:
+    """ETag и Last-Modified по поколению набора данных.
+
+    ETag строится из поколений get_condition_namespace() и
+    condition_depends_on (наборов данных, попадающих в ответ из других
+    моделей), версии API, формата ответа и полного пути запроса,
+    Last-Modified - время последнего сдвига любого из этих поколений.
+    Ответ 304 на If-None-Match или If-Modified-Since отдаётся до запросов
+    к базе.
+    """
+    cache_namespace = None
+    condition_depends_on = ()
+
+    def get_condition_namespace(self):
+        return self.cache_namespace
+
+    def get_last_change(self):
+        changes = [
+            get_last_change(namespace) for namespace in (
+                self.get_condition_namespace(), *self.condition_depends_on)
+        ]
+        version = '.'.join(str(version) for version, _ in changes)
+        return version, max(changed for _, changed in changes)
+
+    def get_etag(self, request, version):
+        digest = hashlib.md5('|'.join((
+            str(request.version),
+            str(request.accepted_media_type),
+            request.get_full_path(),
+        )).encode('utf-8')).hexdigest()
+        return f'"{version}-{digest}"'
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        version, changed = self.get_last_change()
+        etag = self.get_etag(request, version)
+        now = time.time()
+        # Last-Modified точен до секунды: при изменении в текущей секунде
+        # следующее изменение в ту же секунду дало бы тот же заголовок.
+        last_modified = int(changed) if int(changed) < int(now) else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            if may_lag(changed, now):
+                # Старые данные нельзя отдавать с ETag нового поколения.
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalListMixin(ConditionalMixin):
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+
+class ConditionalRetrieveMixin(ConditionalMixin):
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,135 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import DatabaseError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from .metrics import store
+
+COUNTERS = ('requests', 'reused', 'opened', 'replaced')
+
+
+class ConnectionStats:
+    """Переиспользование соединений с базой в текущем процессе.
+
+    Для каждого псевдонима базы считаются запросы, из них обслуженные
+    уже открытым соединением, открытые соединения и соединения,
+    заменённые после неудачной проверки. Данные попадают в файл
+    процесса api.metrics.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.aliases = {}
+
+    def update(self, alias, connected_at=None, **counters):
+        with self.lock:
+            stats = self.aliases.setdefault(
+                alias, {**dict.fromkeys(COUNTERS, 0), 'connected_at': None})
+            for name, value in counters.items():
+                stats[name] += value
+            if connected_at is not None:
+                stats['connected_at'] = connected_at
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                alias: dict(stats) for alias, stats in self.aliases.items()
+            }
+
+
+connection_stats = ConnectionStats()
+store.add_section('connections', connection_stats.snapshot)
+
+
+def connection_report(processes, now=None):
+    """Доля переиспользованных соединений и возраст текущего
+    соединения по воркерам: {pid: {псевдоним: {...}}}."""
+    now = time.time() if now is None else now
+    report = {}
+    for pid, data in processes.items():
+        aliases = {}
+        for alias, stats in data.get('connections', {}).items():
+            requests = stats['requests']
+            connected_at = stats['connected_at']
+            aliases[alias] = {
+                **{name: stats[name] for name in COUNTERS},
+                'reuse_rate': (
+                    round(stats['reused'] / requests, 3) if requests else None
+                ),
+                'age_s': (
+                    round(now - connected_at, 1) if connected_at else None
+                ),
+            }
+        if aliases:
+            report[pid] = aliases
+    return report
+
+
+def is_alive(connection):
+    """Проверочный запрос на соединении DB-API, мимо счётчиков запросов."""
+    try:
+        cursor = connection.connection.cursor()
+        try:
+            cursor.execute('SELECT 1')
+        finally:
+            cursor.close()
+    except connection.Database.Error:
+        return False
+    return True
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Применяет SQLITE_PRAGMAS к каждому новому соединению с SQLite.
+
+    Команды выполняются на соединении DB-API в обход обёрток Django,
+    поэтому не попадают в счётчики запросов (api.middleware).
+    """
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    connection.connected_at = time.time()
+    connection_stats.update(
+        connection.alias, connected_at=connection.connected_at, opened=1)
+
+
+@receiver(request_started)
+def check_connections(sender, **kwargs):
+    """Проверяет постоянные соединения (CONN_MAX_AGE) перед запросом.
+
+    Устаревшие соединения к этому моменту уже закрыты обработчиком
+    Django close_old_connections. Оставшиеся при DB_HEALTH_CHECKS
+    проверяются запросом SELECT 1: разорванное соединение закрывается,
+    и Django открывает новое при первом обращении вместо ошибки 500.
+    """
+    for connection in connections.all():
+        if connection.connection is None:
+            connection_stats.update(connection.alias, requests=1)
+            continue
+        if (settings.DB_HEALTH_CHECKS
+                and not connection.in_atomic_block
+                and not is_alive(connection)):
+            try:
+                connection.close()
+            except DatabaseError:
+                pass
+            # close() не сбрасывает соединение с SQLite в памяти.
+            connection.connection = None
+            connection_stats.update(connection.alias, requests=1, replaced=1)
+            continue
+        connection_stats.update(
+            connection.alias, requests=1, reused=1,
+            connected_at=getattr(connection, 'connected_at', None),
+        )
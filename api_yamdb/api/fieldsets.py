@@ -0,0 +1,75 @@
+from rest_framework.exceptions import ValidationError
+
+from .values import ValuesPlan, position_fields
+
+
+def split_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsMixin:
+    """Ответ из части полей сериалайзера: ?fields=id,name и ?omit=genre.
+
+    Поля ответа идут в порядке Meta.fields сериалайзера. Запрос к базе
+    из filter_queryset сужается по тем же полям (ValuesPlan.narrow): only(),
+    select_related только запрошенных вложенных объектов и
+    prefetch_related только запрошенных списков; поля курсора пагинатора
+    выбираются всегда. Параметры действуют на sparse_actions; ключи кэша
+    ответов и ETag уже содержат полный путь запроса.
+    """
+    fields_param = 'fields'
+    omit_param = 'omit'
+    sparse_actions = ('list', 'retrieve', 'top')
+
+    def get_sparse_fields(self):
+        """Запрошенные поля или None, если нужны все."""
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = self.parse_sparse_fields()
+        return self._sparse_fields
+
+    def parse_sparse_fields(self):
+        if self.action not in self.sparse_actions:
+            return None
+        params = self.request.query_params
+        requested = split_names(params.get(self.fields_param, ''))
+        omitted = split_names(params.get(self.omit_param, ''))
+        if not requested and not omitted:
+            return None
+        available = tuple(self.get_serializer_class().Meta.fields)
+        errors = {}
+        for param, names in ((self.fields_param, requested),
+                             (self.omit_param, omitted)):
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                errors[param] = (
+                    f'Неизвестные поля: {", ".join(unknown)}. '
+                    f'Доступны: {", ".join(available)}.')
+        if errors:
+            raise ValidationError(errors)
+        fields = tuple(
+            name for name in available
+            if (not requested or name in requested) and name not in omitted
+        )
+        if not fields:
+            raise ValidationError(
+                {self.omit_param: 'Нельзя исключить все поля.'})
+        return None if fields == available else fields
+
+    def get_values_plan(self):
+        return ValuesPlan.for_serializer(
+            self.get_serializer_class(), self.get_sparse_fields(),
+            extra=position_fields(self))
+
+    def narrow_queryset(self, queryset):
+        if self.get_sparse_fields() is None:
+            return queryset
+        return self.get_values_plan().narrow(queryset)
+
+    def filter_queryset(self, queryset):
+        return self.narrow_queryset(super().filter_queryset(queryset))
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
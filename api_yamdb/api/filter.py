@@ -1,23 +1,53 @@
 import django_filters
 
 from reviews.models import Title
+from reviews.search import search_titles
+
+from .slugs import category_slugs, genre_slugs
 
 
 class TitlesFilter(django_filters.FilterSet):
-    category = django_filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='iexact'
-    )
-    genre = django_filters.BaseInFilter(
-        field_name='genre__slug',
-        lookup_expr='in'
-    )
+    category = django_filters.CharFilter(method='filter_category')
+    genre = django_filters.BaseInFilter(method='filter_genre')
     name = django_filters.CharFilter(
         field_name='name',
         lookup_expr='icontains'
     )
+    search = django_filters.CharFilter(method='filter_search')
     year = django_filters.NumberFilter()
+    rating_min = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='gte'
+    )
+    rating_max = django_filters.NumberFilter(
+        field_name='rating',
+        lookup_expr='lte'
+    )
 
     class Meta():
         model = Title
-        fields = ['category', 'genre', 'name', 'year']
+        fields = ['category', 'genre', 'name', 'search', 'year',
+                  'rating_min', 'rating_max']
+
+    def filter_category(self, queryset, name, value):
+        """Фильтр по slug категории без JOIN: id берутся из кэша."""
+        return filter_category(queryset, category_slugs.ids_iexact(value))
+
+    def filter_genre(self, queryset, name, value):
+        """Фильтр по списку slug жанров через таблицу связей."""
+        return filter_genre(queryset, genre_slugs.ids(value))
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+
+def filter_category(queryset, ids):
+    if not ids:
+        return queryset.none()
+    return queryset.filter(category_id__in=ids)
+
+
+def filter_genre(queryset, ids):
+    if not ids:
+        return queryset.none()
+    return queryset.filter(genre__in=ids)
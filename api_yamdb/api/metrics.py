@@ -0,0 +1,209 @@
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+
+LABELS = ('viewset', 'action', 'status', 'version')
+
+
+class MetricsStore:
+    """Счётчики и гистограммы задержек запросов к API.
+
+    Каждый процесс копит значения в памяти и не чаще раза
+    в METRICS_FLUSH_INTERVAL секунд сбрасывает их в свой файл
+    METRICS_DIR/<pid>.json. При экспорте файлы всех процессов
+    (воркеров gunicorn) суммируются. Другие модули могут добавить
+    в файл процесса свои данные через add_section и свои счётчики через
+    add_counter.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sections = {}
+        self.counter_help = {}
+        self.reset()
+
+    def add_section(self, name, snapshot):
+        """При каждом сбросе результат snapshot() пишется в файл
+        процесса под ключом name."""
+        self.sections[name] = snapshot
+
+    def add_counter(self, name, help_text):
+        """Счётчик name, суммируемый по процессам в выдаче render."""
+        self.counter_help[name] = help_text
+
+    def reset(self):
+        self.series = {}
+        self.counters = {}
+        self.flushed = 0.0
+
+    @property
+    def path(self):
+        return os.path.join(settings.METRICS_DIR, f'{os.getpid()}.json')
+
+    def observe(self, labels, seconds):
+        buckets = settings.METRICS_BUCKETS
+        key = '|'.join(str(labels.get(name, '')) for name in LABELS)
+        with self.lock:
+            series = self.series.setdefault(
+                key, {'count': 0, 'sum': 0.0, 'buckets': [0] * len(buckets)})
+            series['count'] += 1
+            series['sum'] += seconds
+            index = bisect.bisect_left(buckets, seconds)
+            if index < len(buckets):
+                series['buckets'][index] += 1
+        self.flush()
+
+    def increment(self, name):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+        self.flush()
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        if not force and now - self.flushed < settings.METRICS_FLUSH_INTERVAL:
+            return
+        with self.lock:
+            self.flushed = now
+            data = json.dumps({
+                'series': self.series,
+                'counters': self.counters,
+                **{name: snapshot()
+                   for name, snapshot in self.sections.items()},
+            })
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            file.write(data)
+        os.replace(temp_path, self.path)
+
+    def read_processes(self):
+        """Данные всех процессов: {pid: содержимое файла}."""
+        self.flush(force=True)
+        processes = {}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, '*.json')):
+            pid = os.path.splitext(os.path.basename(path))[0]
+            try:
+                with open(path, encoding='utf-8') as file:
+                    processes[pid] = json.load(file)
+            except (OSError, ValueError):
+                continue
+        return processes
+
+    def collect(self, processes=None):
+        if processes is None:
+            processes = self.read_processes()
+        buckets = settings.METRICS_BUCKETS
+        merged = {}
+        for data in processes.values():
+            for key, series in data.get('series', {}).items():
+                total = merged.setdefault(
+                    key,
+                    {'count': 0, 'sum': 0.0, 'buckets': [0] * len(buckets)})
+                total['count'] += series['count']
+                total['sum'] += series['sum']
+                for index, value in enumerate(series['buckets']):
+                    if index < len(buckets):
+                        total['buckets'][index] += value
+        return merged
+
+    def counter_totals(self, processes=None):
+        """Счётчики add_counter, суммированные по всем процессам."""
+        if processes is None:
+            processes = self.read_processes()
+        totals = dict.fromkeys(self.counter_help, 0)
+        for data in processes.values():
+            for name, value in data.get('counters', {}).items():
+                if name in totals:
+                    totals[name] += value
+        return totals
+
+    def render(self):
+        """Метрики в текстовом формате Prometheus."""
+        processes = self.read_processes()
+        lines = [
+            '# HELP api_requests_total Число запросов к API.',
+            '# TYPE api_requests_total counter',
+        ]
+        histogram = [
+            '# HELP api_request_duration_seconds Время ответа API.',
+            '# TYPE api_request_duration_seconds histogram',
+        ]
+        for key, series in sorted(self.collect(processes).items()):
+            labels = ','.join(
+                f'{name}="{value}"'
+                for name, value in zip(LABELS, key.split('|'))
+            )
+            lines.append(f'api_requests_total{{{labels}}} {series["count"]}')
+            cumulative = 0
+            for bound, value in zip(
+                    settings.METRICS_BUCKETS, series['buckets']):
+                cumulative += value
+                histogram.append(
+                    f'api_request_duration_seconds_bucket'
+                    f'{{{labels},le="{bound}"}} {cumulative}'
+                )
+            histogram.append(
+                f'api_request_duration_seconds_bucket'
+                f'{{{labels},le="+Inf"}} {series["count"]}'
+            )
+            histogram.append(
+                f'api_request_duration_seconds_sum{{{labels}}} '
+                f'{series["sum"]:.6f}'
+            )
+            histogram.append(
+                f'api_request_duration_seconds_count{{{labels}}} '
+                f'{series["count"]}'
+            )
+        lines.extend(histogram)
+        for name, value in self.counter_totals(processes).items():
+            lines.extend((
+                f'# HELP {name} {self.counter_help[name]}',
+                f'# TYPE {name} counter',
+                f'{name} {value}',
+            ))
+        return '\n'.join(lines) + '\n'
+
+
+store = MetricsStore()
+
+
+class MetricsMiddleware:
+    """Замеряет время ответа API с метками viewset, action, status
+    и version и передаёт его в store."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        labels = getattr(request, 'metrics_labels', None)
+        if labels is not None:
+            labels['status'] = response.status_code
+            store.observe(labels, time.perf_counter() - started)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None or match.namespace != 'api':
+            return None
+        view_class = getattr(view_func, 'cls', None)
+        actions = getattr(view_func, 'actions', None) or {}
+        method = request.method.lower()
+        versioning = getattr(view_class, 'versioning_class', None)
+        request.metrics_labels = {
+            'viewset': (
+                view_class.__name__ if view_class else view_func.__name__),
+            'action': actions.get(method, method),
+            'version': (
+                view_kwargs.get('version')
+                or getattr(versioning, 'default_version', None)
+                or ''
+            ),
+        }
+        return None
@@ -0,0 +1,75 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('api.budget')
+
+
+class QueryRecorder:
+    """Считает SQL-запросы и их суммарное время через execute_wrapper."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+def get_budget(route):
+    budget = dict(settings.REQUEST_BUDGET)
+    budget.update(settings.REQUEST_BUDGET_ROUTES.get(route, {}))
+    return budget
+
+
+class QueryBudgetMiddleware:
+    """Замеряет число SQL-запросов, время в БД и общее время ответа.
+
+    Результат отдаётся в заголовке Server-Timing и сохраняется
+    в request.query_stats. При REQUEST_BUDGET_LOG запросы, превысившие
+    бюджет маршрута (REQUEST_BUDGET, REQUEST_BUDGET_ROUTES), пишутся в лог.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = (time.perf_counter() - started) * 1000
+        sql = recorder.duration * 1000
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match else None
+        request.query_stats = {
+            'route': route,
+            'queries': recorder.count,
+            'sql_ms': sql,
+            'total_ms': total,
+        }
+        response['Server-Timing'] = (
+            f'sql;dur={sql:.2f};desc="{recorder.count} queries", '
+            f'view;dur={total - sql:.2f}, '
+            f'total;dur={total:.2f}'
+        )
+        if settings.REQUEST_BUDGET_LOG and route:
+            budget = get_budget(route)
+            if (recorder.count > budget['QUERIES']
+                    or total > budget['MILLISECONDS']):
+                logger.warning(
+                    '%s %s (%s): %d SQL-запросов за %.1f мс, всего %.1f мс',
+                    request.method, request.path, route,
+                    recorder.count, sql, total,
+                )
+        return response
@@ -0,0 +1,107 @@
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (Cursor, CursorPagination,
+                                       PageNumberPagination)
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PageSizePagination(PageNumberPagination):
+    """Постраничная пагинация с размером страницы из параметра page_size."""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class KeysetPagination(CursorPagination):
+    """Курсорная пагинация по паре (pub_date, id), от новых к старым.
+
+    Страница выбирается условием по ключу последней записи предыдущей
+    страницы, без OFFSET и COUNT(*), поэтому время ответа не растёт
+    с глубиной прокрутки. Включается параметром ?pagination=cursor.
+    """
+    mode_query_param = 'pagination'
+    mode = 'cursor'
+    ordering = ('-pub_date', '-id')
+    position_fields = ('pub_date', 'id')
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    @classmethod
+    def is_requested(cls, request):
+        params = request.query_params
+        return (
+            params.get(cls.mode_query_param) == cls.mode
+            or cls.cursor_query_param in params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = bool(self.cursor and self.cursor.reverse)
+        self.position = self.cursor and self.cursor.position
+        if reverse:
+            queryset = queryset.order_by('pub_date', 'id')
+        else:
+            queryset = queryset.order_by('-pub_date', '-id')
+        if self.position:
+            pub_date, pk = self.parse_position(self.position)
+            lookup = 'gt' if reverse else 'lt'
+            # Условие по pub_date вынесено отдельно, чтобы поиск
+            # по составному индексу начинался сразу с нужной позиции.
+            queryset = queryset.filter(
+                **{f'pub_date__{lookup}e': pub_date}
+            ).filter(
+                Q(**{f'pub_date__{lookup}': pub_date})
+                | Q(**{f'id__{lookup}': pk})
+            )
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.has_previous = has_following
+        else:
+            self.has_next = has_following
+            self.has_previous = bool(self.position)
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def parse_position(self, position):
+        pub_date, _, pk = position.rpartition(',')
+        pub_date = parse_datetime(pub_date)
+        if pub_date is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, int(pk)
+
+    def get_position(self, item):
+        if isinstance(item, dict):
+            return f'{item["pub_date"].isoformat()},{item["id"]}'
+        return f'{item.pub_date.isoformat()},{item.id}'
+
+    def get_first_link(self):
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.mode_query_param, self.mode)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return self.get_first_link()
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=False, position=self.get_position(self.page[-1])
+        ))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = (
+            self.get_position(self.page[0]) if self.page else self.position
+        )
+        return self.encode_cursor(Cursor(
+            offset=0, reverse=True, position=position
+        ))
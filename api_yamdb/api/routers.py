@@ -0,0 +1,122 @@
+import hashlib
+import random
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+
+from .shared import SharedSQLite
+
+PIN_PREFIX = 'replica-pin'
+
+PIN_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS replica_pin (
+    key TEXT PRIMARY KEY,
+    until REAL NOT NULL
+) WITHOUT ROWID
+'''
+
+# Вне запросов (команды, воркер почты) и в запросах на запись
+# все чтения идут в основную базу.
+use_primary = ContextVar('use_primary', default=True)
+
+
+class ReplicaRouter:
+    """Чтения моделей из REPLICA_APPS - со случайной реплики
+    из DATABASE_REPLICAS, запись - в основную базу default.
+
+    Реплики используются только в безопасных запросах, которым
+    ReplicaPinMiddleware разрешила чтение с реплик.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (model._meta.app_label not in settings.REPLICA_APPS
+                or not settings.DATABASE_REPLICAS):
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if use_primary.get():
+            return 'default'
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in settings.REPLICA_APPS:
+            return 'default'
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class PinStore(SharedSQLite):
+    """Клиенты, которые недавно писали, в файле VERSIONS_DB, общем для
+    всех воркеров: следующий запрос клиента может попасть в другой
+    воркер. Истёкшие записи удаляются при каждой новой, поэтому таблица
+    не больше числа клиентов, писавших за REPLICA_PIN_SECONDS."""
+    setting = 'VERSIONS_DB'
+    schema = (PIN_SCHEMA,)
+
+    def pin(self, key, seconds):
+        now = time.time()
+        connection = self.connect()
+        connection.execute('DELETE FROM replica_pin WHERE until <= ?', (now,))
+        connection.execute(
+            'INSERT INTO replica_pin (key, until) VALUES (?, ?) '
+            'ON CONFLICT (key) DO UPDATE SET until = excluded.until',
+            (key, now + seconds))
+
+    def pinned(self, key):
+        row = self.connect().execute(
+            'SELECT 1 FROM replica_pin WHERE key = ? AND until > ?',
+            (key, time.time())).fetchone()
+        return row is not None
+
+
+pins = PinStore()
+
+
+def pin_key(request):
+    """Ключ клиента для чтения своих записей: по заголовку
+    Authorization, чтобы не обращаться к базе до выбора реплики."""
+    credentials = request.META.get('HTTP_AUTHORIZATION')
+    if not credentials:
+        return None
+    digest = hashlib.sha1(credentials.encode()).hexdigest()
+    return f'{PIN_PREFIX}:{digest}'
+
+
+class ReplicaPinMiddleware:
+    """Выбирает базу для чтений на время запроса.
+
+    Запросы на запись читают из основной базы. После успешной записи
+    клиент ещё REPLICA_PIN_SECONDS читает из основной базы, чтобы
+    сразу увидеть свой отзыв или комментарий, пока реплика отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        key = pin_key(request)
+        safe = request.method in SAFE_METHODS
+        pinned = not safe or (key is not None and pins.pinned(key))
+        token = use_primary.set(bool(pinned))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_primary.reset(token)
+        if not safe and key is not None and response.status_code < 400:
+            pins.pin(key, settings.REPLICA_PIN_SECONDS)
+        return response
@@ -10,11 +10,14 @@ from reviews.models import (
     Genre,
     Review,
     Title,
+    TitleStats,
     User
 )
 from reviews.validators import (
     username_validator)
 
+from .slugs import category_slugs, genre_slugs
+
 
 REVIEW_ERROR_MESSAGE = "Уже есть ревью на это произведение."
 
@@ -53,6 +56,16 @@ class TokenSerializer(serializers.Serializer):
         max_length=CONFIRMATION_CODE_LENGTH, required=True)
 
 
+class SparseSerializerMixin:
+    """Сериалайзер с частью полей: fields - имена оставляемых полей."""
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
 class GenreSerializer(serializers.ModelSerializer):
     """Сериалазер для модели Genre."""
     class Meta:
@@ -67,37 +80,72 @@ class CategorySerializer(serializers.ModelSerializer):
         model = Category
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseSerializerMixin,
+                      serializers.ModelSerializer):
     """Сериалазер для модели Title."""
     category = CategorySerializer()
     genre = GenreSerializer(many=True)
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
+    weighted_rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
         fields = (
-            'id', 'name', 'year', 'rating', 'description', 'genre', 'category')
+            'id', 'name', 'year', 'rating', 'weighted_rating', 'description',
+            'genre', 'category')
         read_only_fields = fields
 
 
+class CachedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField без запроса к БД: id берётся из SlugMap
+    (api.slugs), вместо объекта возвращается заглушка с pk и slug."""
+
+    def __init__(self, slug_map, **kwargs):
+        self.slug_map = slug_map
+        kwargs.setdefault('queryset', slug_map.model.objects.all())
+        super().__init__(slug_field='slug', **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        pk = self.slug_map.get(data)
+        if pk is None:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        model = self.slug_map.model
+        # Объект как из БД: остальные поля отложены и загрузятся
+        # только при обращении к ним.
+        return model.from_db(model.objects.db, ['id', 'slug'], [pk, data])
+
+
 class TitleCreate(serializers.ModelSerializer):
     """Сериалазер для модели Title."""
-    category = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Category.objects.all()
-    )
-    genre = serializers.SlugRelatedField(
-        slug_field='slug',
-        queryset=Genre.objects.all(),
-        many=True,
-    )
+    category = CachedSlugRelatedField(category_slugs)
+    genre = CachedSlugRelatedField(genre_slugs, many=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = (
+            'rating_sum', 'rating_count', 'rating', 'weighted_rating')
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериалазер статистики оценок произведения."""
+    id = serializers.IntegerField(source='title_id', read_only=True)
+    count = serializers.IntegerField(read_only=True)
+    mean = serializers.FloatField(read_only=True)
+    median = serializers.FloatField(read_only=True)
+    histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = TitleStats
+        fields = (
+            'id', 'count', 'mean', 'median', 'histogram', 'last_review_date')
+        read_only_fields = fields
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseSerializerMixin,
+                       serializers.ModelSerializer):
     """Сериалазер для модели Review."""
     author = serializers.SlugRelatedField(
         read_only=True,
@@ -109,18 +157,9 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def validate(self, data):
-        if self.context['view'].action != 'create':
-            return data
-        if Review.objects.filter(
-            title=self.context['view'].kwargs.get('title_id'),
-            author=self.context['request'].user
-        ).exists():
-            raise serializers.ValidationError(REVIEW_ERROR_MESSAGE)
-        return data
-
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseSerializerMixin,
+                        serializers.ModelSerializer):
     """Сериалазер для модели Comment."""
     author = serializers.SlugRelatedField(read_only=True,
                                           slug_field='username',)
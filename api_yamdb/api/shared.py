@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import threading
+
+from django.conf import settings
+
+
+class SharedSQLite:
+    """Файл SQLite из настройки setting, общий для всех процессов
+    на машине.
+
+    У каждого потока своё соединение; после fork процесс открывает
+    новое. Журнал WAL: читатели не ждут писателя.
+    """
+    setting = None
+    schema = ()
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def connect(self):
+        local = self.local
+        path = getattr(settings, self.setting)
+        if (getattr(local, 'connection', None) is None
+                or local.pid != os.getpid() or local.path != path):
+            connection = sqlite3.connect(
+                path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode = WAL')
+            # Служебные данные не стоят fsync на каждую запись.
+            connection.execute('PRAGMA synchronous = OFF')
+            for statement in self.schema:
+                connection.execute(statement)
+            local.connection = connection
+            local.pid = os.getpid()
+            local.path = path
+        return local.connection
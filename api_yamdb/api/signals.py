@@ -0,0 +1,66 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+from .authentication import revoke_claims
+from .cache import bump_version
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, using, **kwargs):
+    bump_version('categories', 'titles', using=using)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def genre_changed(sender, using, **kwargs):
+    bump_version('genres', 'titles', using=using)
+
+
+@receiver(post_save, sender=Title)
+def title_changed(sender, using, **kwargs):
+    bump_version('titles', using=using)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, using, **kwargs):
+    bump_version('titles', f'reviews:{instance.id}', using=using)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, using, **kwargs):
+    if action.startswith('post_'):
+        bump_version('titles', using=using)
+
+
+@receiver(post_save, sender=Review)
+def review_changed(sender, instance, using, **kwargs):
+    # В выдаче произведений есть рейтинг, зависящий от отзывов.
+    bump_version('titles', f'reviews:{instance.title_id}', using=using)
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, using, **kwargs):
+    bump_version(
+        'titles', f'reviews:{instance.title_id}', f'comments:{instance.id}',
+        using=using)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, using, **kwargs):
+    bump_version(f'comments:{instance.review_id}', using=using)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, using, created=False, update_fields=None,
+                 **kwargs):
+    # Роль и другие поля в выданных токенах могли устареть.
+    revoke_claims(instance.pk, using=using)
+    # Имя автора есть в отзывах и комментариях. У нового пользователя
+    # их ещё нет.
+    if not created and (update_fields is None or 'username' in update_fields):
+        bump_version('users', using=using)
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import router
+
+from reviews.models import Category, Genre
+
+from .cache import get_version
+
+
+class SlugMap:
+    """Процессный кэш slug -> id для небольших справочников.
+
+    Словарь перечитывается целиком, когда меняется поколение набора
+    данных namespace (api.cache): его сдвигают сигналы (api.signals),
+    а хранятся поколения в общем для воркеров файле VERSIONS_DB, поэтому
+    изменения видны во всех воркерах на машине. Изменения в обход
+    сигналов (bulk_create, другая машина) подхватываются не позже чем
+    через SLUG_MAP_TTL секунд.
+    """
+
+    def __init__(self, model, namespace):
+        self.model = model
+        self.namespace = namespace
+        self.version = None
+        self.loaded_at = None
+        self.exact = {}
+        self.folded = {}
+        self.lock = threading.Lock()
+
+    def __deepcopy__(self, memo):
+        # Общий на процесс объект: DRF копирует аргументы полей
+        # сериалайзера, копия кэша не нужна.
+        return self
+
+    def expired(self, version):
+        return (version != self.version or self.loaded_at is None
+                or time.monotonic() - self.loaded_at > settings.SLUG_MAP_TTL)
+
+    def load(self):
+        version = get_version(self.namespace)
+        if self.expired(version):
+            with self.lock:
+                if self.expired(version):
+                    # Из основной базы: отставшая реплика закрепила бы
+                    # старый словарь за новым поколением.
+                    manager = self.model.objects.db_manager(
+                        router.db_for_write(self.model))
+                    exact = dict(manager.values_list('slug', 'id'))
+                    folded = {}
+                    for slug, pk in exact.items():
+                        folded.setdefault(slug.lower(), []).append(pk)
+                    # Версия прочитана до загрузки: если справочник
+                    # изменился в это время, следующий вызов перечитает.
+                    self.exact, self.folded = exact, folded
+                    self.version = version
+                    self.loaded_at = time.monotonic()
+        return self.exact, self.folded
+
+    def get(self, slug):
+        exact, _ = self.load()
+        return exact.get(slug)
+
+    def ids(self, slugs):
+        """id для списка slug, неизвестные пропускаются."""
+        exact, _ = self.load()
+        return [exact[slug] for slug in slugs if slug in exact]
+
+    def ids_iexact(self, slug):
+        _, folded = self.load()
+        return folded.get(slug.lower(), [])
+
+
+category_slugs = SlugMap(Category, 'categories')
+genre_slugs = SlugMap(Genre, 'genres')
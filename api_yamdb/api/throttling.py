@@ -0,0 +1,108 @@
+import logging
+import sqlite3
+
+from django.conf import settings
+from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+
+from .shared import SharedSQLite
+
+logger = logging.getLogger('api.throttling')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS throttle_window (
+    key TEXT PRIMARY KEY,
+    window INTEGER NOT NULL,
+    hits INTEGER NOT NULL,
+    expires REAL NOT NULL
+) WITHOUT ROWID
+'''
+EXPIRES_INDEX = '''
+CREATE INDEX IF NOT EXISTS throttle_window_expires
+ON throttle_window (expires)
+'''
+
+# Счётчик текущего окна: новое окно начинается с 1. Все выражения SET
+# видят старые значения строки.
+HIT = '''
+INSERT INTO throttle_window (key, window, hits, expires) VALUES (?, ?, 1, ?)
+ON CONFLICT (key) DO UPDATE SET
+    hits = CASE WHEN window = excluded.window THEN hits + 1 ELSE 1 END,
+    window = excluded.window,
+    expires = excluded.expires
+RETURNING hits
+'''
+
+
+class ThrottleStore(SharedSQLite):
+    """Счётчики запросов в файле SQLite THROTTLE_DB, общем для всех
+    процессов на машине.
+
+    Окна фиксированные и выровнены по времени, поэтому совпадают во всех
+    воркерах. Проверка - одна команда INSERT ... ON CONFLICT по первичному
+    ключу. На каждого клиента хранится одна строка; строки закончившихся
+    окон каждый процесс удаляет не чаще раза в THROTTLE_PURGE_INTERVAL
+    секунд.
+    """
+    setting = 'THROTTLE_DB'
+    schema = (SCHEMA, EXPIRES_INDEX)
+
+    def __init__(self):
+        super().__init__()
+        self.purged_at = None
+
+    def hit(self, key, duration, now):
+        """Учитывает запрос: число запросов в текущем окне и конец окна."""
+        window = int(now // duration)
+        window_end = (window + 1) * duration
+        connection = self.connect()
+        hits, = connection.execute(HIT, (key, window, window_end)).fetchone()
+        if (self.purged_at is None
+                or now - self.purged_at >= settings.THROTTLE_PURGE_INTERVAL):
+            self.purged_at = now
+            self.purge(now)
+        return hits, window_end
+
+    def purge(self, now):
+        """Удаляет счётчики окон, закончившихся к моменту now."""
+        return self.connect().execute(
+            'DELETE FROM throttle_window WHERE expires <= ?', (now,)
+        ).rowcount
+
+    def clear(self):
+        self.connect().execute('DELETE FROM throttle_window')
+
+
+store = ThrottleStore()
+
+
+class SharedThrottleMixin:
+    """Ограничение частоты по общему для воркеров ThrottleStore вместо
+    списка отметок времени в кэше процесса."""
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self.now = self.timer()
+        try:
+            hits, self.window_end = store.hit(
+                self.key, self.duration, self.now)
+        except sqlite3.OperationalError:
+            # Файл счётчиков занят или недоступен: лимит не проверяется,
+            # чтобы не отвечать 500 на все запросы.
+            logger.exception('Счётчик ограничения частоты недоступен.')
+            return True
+        return hits <= self.num_requests
+
+    def wait(self):
+        return max(0, self.window_end - self.now)
+
+
+class SharedUserRateThrottle(SharedThrottleMixin, UserRateThrottle):
+    pass
+
+
+class SharedAnonRateThrottle(SharedThrottleMixin, AnonRateThrottle):
+    pass
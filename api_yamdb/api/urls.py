@@ -8,6 +8,8 @@ from .views import (
     create_token,
     GenreViewSet,
     MeAPIView,
+    metrics,
+    pool_stats,
     ReviewViewSet,
     TitleViewSet,
     UserViewSet
@@ -65,5 +67,7 @@ urlpatterns = [
         name='users-me'
     ),
     re_path(r'(?P<version>v1)/', include(router_v1.urls)),
-    path('v1/', include(token_auth_urls))
+    path('v1/', include(token_auth_urls)),
+    path('metrics', metrics, name='metrics'),
+    path('pool-stats', pool_stats, name='pool-stats'),
 ]
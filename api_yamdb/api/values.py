@@ -0,0 +1,181 @@
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework import serializers
+from rest_framework.response import Response
+
+FIELD, NESTED, MANY = 'field', 'nested', 'many'
+
+
+class ValuesPlan:
+    """Сериализация строк .values() по плану, составленному один раз
+    из полей ModelSerializer.
+
+    Для каждого поля план хранит ключ строки и to_representation поля
+    сериалайзера, поэтому результат совпадает с сериалайзером, но без
+    создания экземпляров моделей. Поддерживаются поля модели, вложенные
+    сериалайзеры по ForeignKey, SlugRelatedField и вложенные списки по
+    ManyToManyField (один запрос к промежуточной таблице на страницу).
+    Столбцы extra выбираются из базы, но в ответ не попадают.
+    """
+    plans = {}
+
+    def __init__(self, serializer, prefix='', extra=()):
+        self.model = serializer.Meta.model
+        self.columns = []
+        self.steps = []
+        for field in serializer._readable_fields:
+            self.add_field(field, prefix)
+        for column in extra:
+            self.add_column(column)
+
+    @classmethod
+    def for_serializer(cls, serializer_class, fields=None, extra=()):
+        """План сериалайзера, для fields - только по этим полям."""
+        key = (serializer_class, fields, extra)
+        plan = cls.plans.get(key)
+        if plan is None:
+            serializer = (serializer_class() if fields is None
+                          else serializer_class(fields=fields))
+            plan = cls.plans[key] = cls(serializer, extra=extra)
+        return plan
+
+    def add_field(self, field, prefix):
+        source = field.source
+        if '.' in source or source == '*':
+            raise ImproperlyConfigured(
+                f'ValuesPlan: поле {field.field_name} с source={source}.')
+        key = prefix + source
+        if isinstance(field, serializers.ListSerializer):
+            if prefix:
+                raise ImproperlyConfigured(
+                    f'ValuesPlan: вложенный список {field.field_name} '
+                    'поддерживается только на верхнем уровне.')
+            m2m = self.model._meta.get_field(source)
+            if not m2m.many_to_many or m2m.auto_created:
+                raise ImproperlyConfigured(
+                    f'ValuesPlan: {source} не ManyToManyField.')
+            child = ValuesPlan(
+                field.child, prefix=f'{m2m.m2m_reverse_field_name()}__')
+            pk = self.model._meta.pk.attname
+            self.add_column(pk)
+            self.steps.append((MANY, field.field_name, pk, (m2m, child)))
+        elif isinstance(field, serializers.BaseSerializer):
+            child = ValuesPlan(field, prefix=f'{key}__')
+            self.add_column(key)
+            self.columns.extend(child.columns)
+            self.steps.append((NESTED, field.field_name, key, child))
+        elif isinstance(field, serializers.SlugRelatedField):
+            key = f'{key}__{field.slug_field}'
+            self.add_column(key)
+            self.steps.append((FIELD, field.field_name, key, None))
+        elif isinstance(field, serializers.RelatedField):
+            raise ImproperlyConfigured(
+                f'ValuesPlan: поле {field.field_name} '
+                f'{type(field).__name__} не поддерживается.')
+        else:
+            model_field = self.model._meta.get_field(source)
+            if not model_field.concrete or model_field.is_relation:
+                raise ImproperlyConfigured(
+                    f'ValuesPlan: {source} не поле модели {self.model}.')
+            self.add_column(key)
+            self.steps.append(
+                (FIELD, field.field_name, key, field.to_representation))
+
+    def add_column(self, key):
+        if key not in self.columns:
+            self.columns.append(key)
+
+    def values(self, queryset):
+        values = queryset.prefetch_related(None).values(*self.columns)
+        # Пагинатор считает строки исходного запроса: JOIN вложенных
+        # полей в COUNT(*) не нужны.
+        values.count = queryset.count
+        return values
+
+    def narrow(self, queryset):
+        """queryset, загружающий только поля плана: only(),
+        select_related вложенных объектов и prefetch_related списков."""
+        only = [self.model._meta.pk.name]
+        related = []
+        for column in self.columns:
+            parts = column.split('__')
+            for depth in range(1, len(parts)):
+                path = '__'.join(parts[:depth])
+                if path not in related:
+                    related.append(path)
+                    only.append(path)
+            only.append(column)
+        prefetch = [
+            payload[0].name for kind, _, _, payload in self.steps
+            if kind == MANY
+        ]
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*related)
+        return queryset.prefetch_related(*prefetch).only(*only)
+
+    def fetch_many(self, m2m, child, ids):
+        """Строки вложенного списка по id родителя, в порядке
+        Meta.ordering связанной модели, как при prefetch_related."""
+        from_name = m2m.m2m_field_name()
+        to_name = m2m.m2m_reverse_field_name()
+        ordering = [
+            f'-{to_name}__{name[1:]}' if name.startswith('-')
+            else f'{to_name}__{name}'
+            for name in m2m.related_model._meta.ordering
+        ]
+        rows = m2m.remote_field.through.objects.filter(
+            **{f'{from_name}__in': ids}
+        ).order_by(*ordering).values(from_name, *child.columns)
+        related = {}
+        for row in rows:
+            related.setdefault(row[from_name], []).append(child.build(row))
+        return related
+
+    def serialize(self, rows):
+        rows = list(rows)
+        related = {}
+        for kind, name, key, payload in self.steps:
+            if kind == MANY:
+                related[name] = self.fetch_many(
+                    *payload, [row[key] for row in rows]) if rows else {}
+        return [self.build(row, related) for row in rows]
+
+    def build(self, row, related=None):
+        data = {}
+        for kind, name, key, payload in self.steps:
+            if kind == FIELD:
+                value = row[key]
+                if value is not None and payload is not None:
+                    value = payload(value)
+                data[name] = value
+            elif kind == NESTED:
+                data[name] = None if row[key] is None else payload.build(row)
+            else:
+                data[name] = related[name].get(row[key], [])
+        return data
+
+
+def position_fields(view):
+    """Поля, по которым пагинатор view строит курсор: они нужны
+    в каждой строке страницы, даже если их нет в ответе."""
+    return tuple(getattr(view.paginator, 'position_fields', ()))
+
+
+class ValuesListMixin:
+    """list через .values() и ValuesPlan сериалайзера из
+    get_serializer_class(), если включён FAST_READ_SERIALIZERS."""
+
+    def get_values_plan(self):
+        return ValuesPlan.for_serializer(
+            self.get_serializer_class(), extra=position_fields(self))
+
+    def list(self, request, *args, **kwargs):
+        if not settings.FAST_READ_SERIALIZERS:
+            return super().list(request, *args, **kwargs)
+        plan = self.get_values_plan()
+        queryset = plan.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(plan.serialize(page))
+        return Response(plan.serialize(queryset))
@@ -1,30 +1,42 @@
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.shortcuts import get_object_or_404
-from django.db.models import Avg
 from django.db.utils import IntegrityError
+from django.http import Http404, HttpResponse
 
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import (generics, mixins, permissions, status,
                             viewsets, filters)
 from rest_framework.filters import SearchFilter
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.versioning import URLPathVersioning
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework.decorators import api_view, permission_classes
-
-from reviews.models import Category, Genre, Review, Title, User
-
-from .filter import TitlesFilter
+from rest_framework.decorators import action, api_view, permission_classes
+
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            TitleStats, User)
+from reviews.outbox import enqueue_mail
+
+from .authentication import ClaimsAccessToken
+from .cache import (CachedListMixin, CachedRetrieveMixin,
+                    ConditionalListMixin, ConditionalRetrieveMixin)
+from .db import connection_report
+from .fieldsets import SparseFieldsMixin
+from .filter import TitlesFilter, filter_category, filter_genre
+from .metrics import store
+from .pagination import KeysetPagination, PageSizePagination
 from .permissions import (
     IsAdmin,
     IsAdminOrReadOnly,
     ReadOnlyOrIsAdminOrModeratorOrAuthor,
 )
+from .slugs import category_slugs, genre_slugs
+from .values import ValuesListMixin
 from .serializers import (
-    CategorySerializer, CommentSerializer,
+    REVIEW_ERROR_MESSAGE, CategorySerializer, CommentSerializer,
     GenreSerializer, ReviewSerializer, SignupSerializer,
-    TitleCreate, TitleSerializer, TokenSerializer,
+    TitleCreate, TitleSerializer, TitleStatsSerializer, TokenSerializer,
     RestrictedUserRoleSerializer, UserSerializer
 )
 from api_yamdb.settings import FROM_EMAIL
@@ -40,7 +52,8 @@ class FirstVersioning(URLPathVersioning):
 @permission_classes([permissions.AllowAny])
 def create_user(request):
     """View для регистрации и создания пользователя
-    с последующей отсылкой confirmation code на email этого пользователя."""
+    с последующей отсылкой confirmation code на email этого пользователя.
+    Письмо ставится в очередь и отправляется через run_mail_worker."""
     serializer = SignupSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data['username']
@@ -57,12 +70,11 @@ def create_user(request):
         )
     token = default_token_generator.make_token(
         user)
-    send_mail(
+    enqueue_mail(
         subject='Ваш код для получения api-токена.',
         message=f'Код: {token}',
         from_email=FROM_EMAIL,
         recipient_list=[user.email],
-        fail_silently=False,
     )
     return (Response(serializer.data,
                      status=status.HTTP_200_OK))
@@ -81,7 +93,7 @@ def create_token(request):
         user,
         confirmation_code
     ):
-        token = AccessToken.for_user(user)
+        token = ClaimsAccessToken.for_user(user)
         return Response(
             {"token": f"{token}"},
             status=status.HTTP_200_OK
@@ -92,6 +104,28 @@ def create_token(request):
     )
 
 
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def metrics(request):
+    """Метрики API в формате Prometheus, суммарно по всем воркерам."""
+    return HttpResponse(
+        store.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def pool_stats(request):
+    """Переиспользование соединений с базой по воркерам."""
+    return Response({
+        'conn_max_age': {
+            alias: config.get('CONN_MAX_AGE', 0)
+            for alias, config in settings.DATABASES.items()
+        },
+        'workers': connection_report(store.read_processes()),
+    })
+
+
 class UserViewSet(viewsets.ModelViewSet):
     """Viewset для модели  User."""
     versioning_class = FirstVersioning
@@ -113,22 +147,83 @@ class MeAPIView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(ConditionalListMixin, ConditionalRetrieveMixin,
+                   CachedListMixin, CachedRetrieveMixin, SparseFieldsMixin,
+                   ValuesListMixin, viewsets.ModelViewSet):
     """Viewset для модели  Title."""
-    queryset = Title.objects.all().annotate(rating=Avg("reviews__score"))
+    cache_namespace = 'titles'
+    queryset = Title.objects.select_related(
+        'category').prefetch_related('genre')
     versioning_class = FirstVersioning
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = TitlesFilter
-    ordering_fields = ('category', 'genre', 'name', 'year',)
+    ordering_fields = (
+        'category', 'genre', 'name', 'year', 'rating', 'weighted_rating',)
+    top_size = 10
 
     def get_serializer_class(self):
-        if self.action in ('list', 'retrieve'):
+        if self.action in ('list', 'retrieve', 'top'):
             return TitleSerializer
+        if self.action in ('stats', 'batch_stats'):
+            return TitleStatsSerializer
         return TitleCreate
 
+    @action(detail=False)
+    def top(self, request, *args, **kwargs):
+        """Лучшие произведения по взвешенному рейтингу, можно в пределах
+        категории (?category=slug) и жанра (?genre=slug), размер - ?limit.
+        Идёт по индексу weighted_rating без сортировки таблицы."""
+        return self.cached_response(self.top_titles, request)
+
+    def top_titles(self, request):
+        try:
+            limit = int(request.query_params.get('limit', self.top_size))
+        except ValueError:
+            limit = self.top_size
+        limit = min(max(limit, 1), PageSizePagination.max_page_size)
+        titles = self.narrow_queryset(self.get_queryset()).filter(
+            weighted_rating__isnull=False)
+        category = request.query_params.get('category')
+        if category:
+            titles = filter_category(titles, category_slugs.ids([category]))
+        genre = request.query_params.get('genre')
+        if genre:
+            titles = filter_genre(titles, genre_slugs.ids([genre]))
+        titles = titles.order_by('-weighted_rating', 'id')[:limit]
+        return Response(self.get_serializer(titles, many=True).data)
+
+    @action(detail=True)
+    def stats(self, request, *args, **kwargs):
+        """Распределение оценок, число отзывов, среднее, медиана и дата
+        последнего отзыва из строки TitleStats: один запрос."""
+        pk = self.kwargs['pk']
+        stats = TitleStats.for_titles([int(pk)]) if pk.isdigit() else []
+        if not stats:
+            raise Http404
+        return Response(self.get_serializer(stats[0]).data)
+
+    @action(detail=False, url_path='stats')
+    def batch_stats(self, request, *args, **kwargs):
+        """Статистика нескольких произведений: ?ids=1,2,3.
+        Несуществующие id пропускаются."""
+        ids = request.query_params.get('ids', '')
+        try:
+            ids = list(dict.fromkeys(
+                int(pk) for pk in ids.split(',') if pk.strip()))
+        except ValueError:
+            raise ValidationError({'ids': 'Ожидаются id через запятую.'})
+        limit = PageSizePagination.max_page_size
+        if not ids or len(ids) > limit:
+            raise ValidationError(
+                {'ids': f'Нужно от 1 до {limit} id произведений.'})
+        serializer = self.get_serializer(
+            TitleStats.for_titles(ids), many=True)
+        return Response(serializer.data)
+
 
 class BaseCategoryGenreView(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -149,50 +244,129 @@ class CategoryViewSet(BaseCategoryGenreView):
     """Viewset для модели  Category."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_namespace = 'categories'
 
 
 class GenreViewSet(BaseCategoryGenreView):
     """Viewset для модели  Genre."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_namespace = 'genres'
 
 
-class BaseReviewCommentViewSet(viewsets.ModelViewSet):
+class BaseReviewCommentViewSet(ConditionalListMixin,
+                               ConditionalRetrieveMixin,
+                               SparseFieldsMixin,
+                               ValuesListMixin,
+                               viewsets.ModelViewSet):
     """Базовый класс ревью и комментариев."""
     queryset = None
     serializer_class = None
+    parent_getter = None
 
     versioning_class = FirstVersioning
     permission_classes = (
         permissions.IsAuthenticatedOrReadOnly,
         ReadOnlyOrIsAdminOrModeratorOrAuthor,
     )
+    cursor_pagination_class = KeysetPagination
+    # В ответе есть имя автора.
+    condition_depends_on = ('users',)
+
+    @property
+    def paginator(self):
+        """Курсорная пагинация по запросу клиента, иначе постраничная."""
+        if not hasattr(self, '_paginator'):
+            if self.cursor_pagination_class.is_requested(self.request):
+                self._paginator = self.cursor_pagination_class()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
+    def get_parent(self):
+        """Объект из URL, к которому относятся записи (404, если его нет):
+        метод parent_getter. Списки фильтруются по id из URL без
+        отдельного запроса родителя."""
+        return getattr(self, self.parent_getter)()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            # Пустая страница: отличаем родителя без записей
+            # от несуществующего.
+            self.get_parent()
+        return page
 
 
 class ReviewViewSet(BaseReviewCommentViewSet):
-    """Viewset для модели  Review."""
+    """Viewset для модели  Review.
+
+    SQL-запросы без учёта аутентификации:
+    list - count и страница с авторами, если отзывов нет - count и
+    проверка произведения для 404; retrieve - 1;
+    create - произведение, INSERT, обновление рейтинга, сводки оценок
+    (RatingSummary), проверка сдвига средней и обновление статистики
+    оценок (TitleStats);
+    update и destroy - отзыв, запись, обновление рейтинга, сводки и
+    статистики.
+    """
     serializer_class = ReviewSerializer
+    parent_getter = 'get_title'
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).select_related('author')
+
+    def get_condition_namespace(self):
+        return f'reviews:{self.kwargs.get("title_id")}'
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        title = self.get_title()
+        try:
+            serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            # Повторный отзыв отсекает ограничение unique_review.
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [REVIEW_ERROR_MESSAGE]})
 
 
 class CommentViewSet(BaseReviewCommentViewSet):
-    """Viewset для модели  Comment."""
+    """Viewset для модели  Comment.
+
+    SQL-запросы без учёта аутентификации:
+    list - count и страница с авторами, отзыв и произведение проверяются
+    в том же запросе; если комментариев нет - count и проверка отзыва
+    для 404; retrieve - 1; create - отзыв и INSERT;
+    update и destroy - комментарий и запись.
+    """
     versioning_class = FirstVersioning
     serializer_class = CommentSerializer
+    parent_getter = 'get_review'
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs.get('reviews'))
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('reviews'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('reviews'),
+            review__title_id=self.kwargs.get('title_id'),
+        ).select_related('author')
+
+    def get_condition_namespace(self):
+        return f'comments:{self.kwargs.get("reviews")}'
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
@@ -28,11 +28,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'django_filters',
-    'reviews',
-    'api',
+    'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
+    'api.middleware.QueryBudgetMiddleware',
+    'api.routers.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -66,15 +69,52 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
+# CONN_MAX_AGE - сколько секунд воркер держит соединение открытым между
+# запросами: 0 - новое соединение на каждый запрос, None - без ограничения.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
     }
 }
 
+# Реплики только для чтения (api.routers): DB_REPLICAS - пути к копиям
+# базы через запятую. Безопасные запросы читают модели REPLICA_APPS
+# с реплик, клиент после своей записи ещё REPLICA_PIN_SECONDS читает
+# из основной базы (отметка в общем для воркеров файле VERSIONS_DB).
+# В тестах реплики повторяют основную базу.
+DATABASE_REPLICAS = []
+for number, name in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+REPLICA_APPS = ('reviews',)
+REPLICA_PIN_SECONDS = 5
+
+# Проверка открытого соединения перед каждым запросом (api.db):
+# разорванное соединение заменяется новым.
+DB_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS', '1') == '1'
+
 AUTH_USER_MODEL = 'reviews.User'
 
+# Настройки каждого соединения с SQLite (api.db). WAL позволяет читать
+# во время записи, busy_timeout - ждать блокировку вместо ошибки
+# database is locked. Пустой словарь отключает профиль.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 
 # Password validation
 
@@ -98,7 +138,7 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticated',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
@@ -135,17 +175,28 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.AnonRateThrottle',
+        'api.throttling.SharedUserRateThrottle',
+        'api.throttling.SharedAnonRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'user': '500/minute',
         'anon': '100/minute',
     },
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    # FastJSONRenderer и FastJSONParser используют orjson, если он
+    # установлен; JSONRenderer и JSONParser DRF - стандартный json.
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageSizePagination',
     'PAGE_SIZE': 5,
 }
 
@@ -154,14 +205,85 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.getenv(
+            'API_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'api'),
+    },
+}
+
+# Наибольший возраст кэша slug -> id категорий и жанров (api.slugs)
+# в секундах: для изменений в обход сигналов.
+SLUG_MAP_TTL = 60
+
+# Счётчики ограничения частоты запросов (api.throttling): файл SQLite,
+# общий для всех воркеров на машине.
+THROTTLE_DB = os.getenv(
+    'THROTTLE_DB', os.path.join(BASE_DIR, 'throttle.sqlite3'))
+# Как часто каждый процесс удаляет счётчики закончившихся окон, секунды.
+THROTTLE_PURGE_INTERVAL = 60
+
+# Списки произведений, отзывов и комментариев строятся из .values()
+# без экземпляров моделей (api.values); 0 - через сериалайзеры.
+FAST_READ_SERIALIZERS = os.getenv('FAST_READ_SERIALIZERS', '1') == '1'
+
+# Бюджет запроса к API (api.middleware.QueryBudgetMiddleware):
+# число SQL-запросов и время ответа в миллисекундах. Для отдельных маршрутов
+# можно задать свой, например {'api:titles-list': {'QUERIES': 3}}.
+REQUEST_BUDGET = {'QUERIES': 20, 'MILLISECONDS': 500}
+REQUEST_BUDGET_ROUTES = {}
+REQUEST_BUDGET_LOG = os.getenv('REQUEST_BUDGET_LOG', '') == '1'
+
+# Метрики Prometheus (api.metrics): каталог с файлами воркеров,
+# его нужно очищать при перезапуске сервиса.
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(BASE_DIR, 'metrics'))
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+# Взвешенный рейтинг произведений (reviews.ratings): сколько оценок
+# весит средняя по всем отзывам, при каком её сдвиге пересчитываются
+# рейтинги всех произведений и сколько произведений в одном UPDATE.
+RATING_MIN_VOTES = 10
+RATING_MEAN_TOLERANCE = 0.05
+RATING_REFRESH_BATCH = 1000
+
+# Кэш ответов анонимным пользователям (api.cache). Поколения данных,
+# по которым строятся ключи и ETag, хранятся в файле SQLite VERSIONS_DB,
+# общем для всех воркеров на машине: изменение в одном воркере сбрасывает
+# кэш во всех, даже если у каждого свой LocMemCache. Общий бэкенд
+# (filebased или redis) нужен только для общей доли попаданий.
+VERSIONS_DB = os.getenv(
+    'VERSIONS_DB', os.path.join(BASE_DIR, 'versions.sqlite3'))
+API_CACHE_ALIAS = 'api'
+API_CACHE_TIMEOUT = 60 * 5
+
 EMAIL_USE_TLS = True
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 EMAIL_PORT = 587
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Для локальной работы без почтового сервера подходят filebased и
+# django.core.mail.backends.console.EmailBackend.
+EMAIL_BACKEND = os.getenv(
+    'EMAIL_BACKEND',
+    'django.core.mail.backends.filebased.EmailBackend'
+)
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
+# Очередь писем (manage.py run_mail_worker), задержки в секундах.
+MAIL_MAX_ATTEMPTS = 5
+MAIL_RETRY_DELAY = 30
+MAIL_RETRY_MAX_DELAY = 60 * 60
+MAIL_SEND_TIMEOUT = 60 * 5
+
 FROM_EMAIL = 'ex@yamail.ru'
 
 # USER FIELDS LENGTH
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Category, Comment, Genre, Review, Title, User
+from .models import (Category, Comment, Genre, OutgoingEmail, Review, Title,
+                     User)
 
 
 @admin.register(User)
@@ -26,7 +27,8 @@ class GenreAdmin(admin.ModelAdmin):
 
 @admin.register(Title)
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('name',)
+    list_display = ('name', 'rating', 'rating_count')
+    readonly_fields = ('rating', 'rating_sum', 'rating_count')
     empty_value_display = '-пусто-'
 
 
@@ -40,3 +42,10 @@ class ReviewAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('review_id', 'author', 'pub_date')
     empty_value_display = '-пусто-'
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('to', 'subject', 'attempts', 'send_after', 'sent_at')
+    list_filter = ('sent_at',)
+    empty_value_display = '-пусто-'
@@ -0,0 +1,63 @@
+import itertools
+from contextlib import contextmanager
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+
+@contextmanager
+def keep_pub_date(*models):
+    """Отключает auto_now_add у поля pub_date моделей, чтобы bulk_create
+    сохранил даты из загружаемых данных, а не текущее время."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    saved = [field.auto_now_add for field in fields]
+    try:
+        for field in fields:
+            field.auto_now_add = False
+        yield
+    finally:
+        for field, auto_now_add in zip(fields, saved):
+            field.auto_now_add = auto_now_add
+
+
+def reset_sequences(models):
+    """Сдвигает счётчики id после вставки с явными id (PostgreSQL)."""
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+def insert_rows(model, fields, rows, batch_size):
+    """Вставляет кортежи значений полей fields пачками через executemany,
+    не создавая объектов моделей. Возвращает число вставленных строк."""
+    fields = [model._meta.get_field(name) for name in fields]
+    quote = connection.ops.quote_name
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(field.column) for field in fields),
+        ', '.join(['%s'] * len(fields)),
+    )
+    dates = [
+        index for index, field in enumerate(fields)
+        if field.get_internal_type() == 'DateTimeField'
+    ]
+    created = 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return created
+        if dates:
+            batch = [prepare_dates(row, dates, fields) for row in batch]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, batch)
+        created += len(batch)
+
+
+def prepare_dates(row, dates, fields):
+    row = list(row)
+    for index in dates:
+        row[index] = fields[index].get_db_prep_value(
+            row[index], connection)
+    return row
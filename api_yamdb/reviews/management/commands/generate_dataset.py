@@ -0,0 +1,176 @@
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from django.utils import timezone
+
+from reviews.models import (ROLES, Category, Comment, Genre, Review, Title,
+                            User)
+
+from ._bulk import insert_rows, reset_sequences
+
+GenreTitle = Title.genre.through
+
+USER_FIELDS = (
+    'id', 'username', 'email', 'role', 'bio', 'first_name', 'last_name',
+    'password', 'is_superuser', 'is_staff', 'is_active', 'date_joined',
+)
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'description', 'category', 'rating_sum',
+    'rating_count',
+)
+REVIEW_FIELDS = ('id', 'title', 'author', 'text', 'score', 'pub_date')
+COMMENT_FIELDS = ('review', 'author', 'text', 'pub_date')
+
+WORDS = (
+    'сюжет', 'актёры', 'финал', 'музыка', 'режиссёр', 'атмосфера', 'герой',
+    'диалоги', 'темп', 'книга', 'автор', 'идея', 'сцена', 'эпизод', 'стиль',
+    'отлично', 'скучно', 'неожиданно', 'затянуто', 'сильно', 'слабо',
+    'рекомендую', 'пересмотрю', 'перечитаю', 'шедевр', 'провал', 'классика',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетический набор данных для нагрузочного тестирования. '
+        'Число отзывов на произведение распределено по закону Ципфа, '
+        'пары (произведение, автор) уникальны, результат определяется --seed. '
+        'Строки вставляются пачками через executemany, без объектов моделей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--reviews-per-title', type=float, default=20,
+            help='Среднее число отзывов на произведение.')
+        parser.add_argument(
+            '--comments-per-review', type=float, default=1,
+            help='Среднее число комментариев к отзыву.')
+        parser.add_argument(
+            '--genres-per-title', type=int, default=3,
+            help='Наибольшее число жанров у произведения.')
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument(
+            '--zipf', type=float, default=1.1,
+            help='Показатель распределения Ципфа для отзывов.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        if options['genres_per_title'] > options['genres']:
+            raise CommandError('--genres-per-title больше, чем --genres.')
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.start_date = timezone.make_aware(datetime(2015, 1, 1))
+        self.period = 8 * 365 * 24 * 3600
+        started = time.monotonic()
+
+        categories = self.new_ids(Category, options['categories'])
+        self.insert(Category, ('id', 'name', 'slug'), (
+            (pk, f'Категория {pk}', f'category-{pk}') for pk in categories
+        ))
+        genres = self.new_ids(Genre, options['genres'])
+        self.insert(Genre, ('id', 'name', 'slug'), (
+            (pk, f'Жанр {pk}', f'genre-{pk}') for pk in genres
+        ))
+        users = self.new_ids(User, options['users'])
+        self.insert(User, USER_FIELDS, (
+            (pk, f'user{pk}', f'user{pk}@yamdb.fake', ROLES.user, '', '', '',
+             '', False, False, True, self.start_date)
+            for pk in users
+        ))
+        titles = self.new_ids(Title, options['titles'])
+        self.insert(Title, TITLE_FIELDS, (
+            (pk, self.text(2, 5).capitalize(), self.rng.randint(1950, 2022),
+             self.text(10, 30), self.rng.choice(categories), 0, 0)
+            for pk in titles
+        ))
+        self.insert(
+            GenreTitle, ('title', 'genre'),
+            self.title_genres(titles, genres, options['genres_per_title']),
+            label='Жанры произведений',
+        )
+        counts = self.zipf_counts(
+            len(titles),
+            round(len(titles) * options['reviews_per_title']),
+            options['zipf'],
+            limit=len(users),
+        )
+        review_ids = self.new_ids(Review, sum(counts))
+        self.insert(Review, REVIEW_FIELDS, self.reviews(
+            titles, counts, users, iter(review_ids)))
+        self.insert(Comment, COMMENT_FIELDS, self.comments(
+            review_ids, users, options['comments_per_review']))
+
+        reset_sequences([Category, Genre, User, Title, Review, Comment])
+        call_command('rebuild_search_index', stdout=self.stdout)
+        call_command('rebuild_ratings', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started:.1f} с.'))
+
+    def new_ids(self, model, count):
+        """Свободный диапазон id: связи заполняются без чтения из базы."""
+        start = (model.objects.aggregate(top=Max('id'))['top'] or 0) + 1
+        return range(start, start + count)
+
+    def text(self, low, high):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(low, high)))
+
+    def pub_date(self):
+        return self.start_date + timedelta(
+            seconds=self.rng.randrange(self.period),
+            microseconds=self.rng.randrange(1000000),
+        )
+
+    def zipf_counts(self, size, total, exponent, limit):
+        """Число отзывов для каждого произведения: доля произведения
+        ранга r пропорциональна 1 / r ** exponent, ранги перемешаны."""
+        weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+        scale = total / sum(weights)
+        counts = [min(limit, round(weight * scale)) for weight in weights]
+        self.rng.shuffle(counts)
+        return counts
+
+    def title_genres(self, titles, genres, limit):
+        for title_id in titles:
+            count = self.rng.randint(1, limit)
+            for genre_id in self.rng.sample(genres, count):
+                yield title_id, genre_id
+
+    def reviews(self, titles, counts, users, ids):
+        for title_id, count in zip(titles, counts):
+            quality = self.rng.gauss(6.5, 1.5)
+            for author_id in self.rng.sample(users, count):
+                score = round(self.rng.gauss(quality, 1.8))
+                yield (
+                    next(ids), title_id, author_id, self.text(5, 40),
+                    min(10, max(1, score)), self.pub_date(),
+                )
+
+    def comments(self, review_ids, users, mean):
+        if mean <= 0:
+            return
+        for review_id in review_ids:
+            # Геометрическое распределение со средним mean (целая часть
+            # экспоненциальной величины с интенсивностью ln(1 + 1 / mean)):
+            # у большинства отзывов комментариев мало, у немногих - много.
+            for _ in range(int(self.rng.expovariate(math.log1p(1 / mean)))):
+                yield (
+                    review_id, self.rng.choice(users), self.text(3, 20),
+                    self.pub_date(),
+                )
+
+    def insert(self, model, fields, rows, label=None):
+        started = time.monotonic()
+        created = insert_rows(model, fields, rows, self.batch_size)
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{label or model._meta.verbose_name_plural}: {created} '
+            f'за {elapsed:.1f} с ({created / elapsed:.0f} строк/с).'
+        )
@@ -0,0 +1,227 @@
+import csv
+import itertools
+import json
+import os
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+from django.utils.dateparse import parse_datetime
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+from ._bulk import keep_pub_date, reset_sequences
+
+GenreTitle = Title.genre.through
+
+# Файлы в порядке загрузки: сначала те, на кого ссылаются остальные.
+SOURCES = (
+    ('users.csv', User),
+    ('category.csv', Category),
+    ('genre.csv', Genre),
+    ('titles.csv', Title),
+    ('genre_title.csv', GenreTitle),
+    ('review.csv', Review),
+    ('comments.csv', Comment),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает данные из CSV-файлов в базу порциями через bulk_create. '
+        'Каждая порция сохраняется в своей транзакции; после сбоя загрузку '
+        'можно продолжить с места остановки ключом --resume.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            default=os.path.join(settings.BASE_DIR, 'static', 'data'),
+            help='Каталог с CSV-файлами.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Сколько строк сохранять одной транзакцией.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=os.path.join(settings.BASE_DIR, '.import_csv.json'),
+            help='Файл с числом уже загруженных строк каждого CSV.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Продолжить загрузку по файлу --checkpoint.',
+        )
+
+    def handle(self, *args, **options):
+        self.chunk_size = options['chunk_size']
+        self.checkpoint_path = options['checkpoint']
+        self.done = self.read_checkpoint() if options['resume'] else {}
+        self.ids = {}
+        self.slugs = {}
+        loaded = []
+        for filename, model in SOURCES:
+            path = os.path.join(options['path'], filename)
+            if not os.path.exists(path):
+                self.stdout.write(f'{filename}: файл не найден, пропускаю.')
+                continue
+            self.load(path, filename, model)
+            # С --resume часть строк могла загрузить прерванная попытка,
+            # после которой пересчёты не запускались.
+            if model.objects.exists():
+                loaded.append(model)
+        reset_sequences(loaded)
+        if Title in loaded:
+            call_command('rebuild_search_index', stdout=self.stdout)
+        if Review in loaded:
+            call_command('rebuild_ratings', stdout=self.stdout)
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    def load(self, path, filename, model):
+        build = getattr(self, f'build_{model._meta.model_name}')
+        start = self.done.get(filename, 0)
+        created = skipped = 0
+        started = time.monotonic()
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = itertools.islice(csv.DictReader(file), start, None)
+            position = start
+            while True:
+                chunk = list(itertools.islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                try:
+                    objects = [
+                        obj for obj in (build(row) for row in chunk) if obj
+                    ]
+                    with transaction.atomic(), keep_pub_date(Review, Comment):
+                        model.objects.bulk_create(objects)
+                except (DatabaseError, KeyError, ValueError) as error:
+                    self.write_checkpoint()
+                    raise CommandError(
+                        f'{filename}: не удалось сохранить строки '
+                        f'{position + 1}-{position + len(chunk)}: {error}. '
+                        'Исправьте данные и запустите команду с --resume.'
+                    )
+                self.remember(model, objects)
+                position += len(chunk)
+                created += len(objects)
+                skipped += len(chunk) - len(objects)
+                self.done[filename] = position
+                self.write_checkpoint()
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{filename}: загружено {created}, пропущено {skipped} '
+            f'за {elapsed:.1f} с ({created / elapsed:.0f} строк/с).'
+        )
+
+    def known_ids(self, model):
+        if model not in self.ids:
+            self.ids[model] = set(
+                model.objects.values_list('id', flat=True).iterator())
+        return self.ids[model]
+
+    def slug_map(self, model, field='slug'):
+        if model not in self.slugs:
+            self.slugs[model] = dict(
+                model.objects.values_list(field, 'id').iterator())
+        return self.slugs[model]
+
+    def remember(self, model, objects):
+        if model in self.ids:
+            self.ids[model].update(obj.id for obj in objects)
+        if model in self.slugs:
+            field = 'username' if model is User else 'slug'
+            self.slugs[model].update(
+                (getattr(obj, field), obj.id) for obj in objects)
+
+    def resolve(self, model, value):
+        """id связанной записи по id или slug (username для User).
+        Ссылки на отсутствующие записи дают None, строка пропускается."""
+        value = (value or '').strip()
+        if value.isdigit():
+            pk = int(value)
+            return pk if pk in self.known_ids(model) else None
+        field = 'username' if model is User else 'slug'
+        return self.slug_map(model, field).get(value)
+
+    def build_user(self, row):
+        return User(
+            id=int(row['id']),
+            username=row['username'],
+            email=row['email'],
+            role=row.get('role') or User._meta.get_field('role').default,
+            bio=row.get('bio', ''),
+            first_name=row.get('first_name', ''),
+            last_name=row.get('last_name', ''),
+        )
+
+    def build_category(self, row):
+        return Category(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+    def build_genre(self, row):
+        return Genre(id=int(row['id']), name=row['name'], slug=row['slug'])
+
+    def build_title(self, row):
+        category_id = None
+        if row.get('category'):
+            category_id = self.resolve(Category, row['category'])
+            if category_id is None:
+                return None
+        return Title(
+            id=int(row['id']),
+            name=row['name'],
+            year=int(row['year']),
+            description=row.get('description') or None,
+            category_id=category_id,
+        )
+
+    def build_title_genre(self, row):
+        title_id = self.resolve(Title, row['title_id'])
+        genre_id = self.resolve(Genre, row['genre_id'])
+        if title_id is None or genre_id is None:
+            return None
+        return GenreTitle(
+            id=int(row['id']), title_id=title_id, genre_id=genre_id)
+
+    def build_review(self, row):
+        title_id = self.resolve(Title, row['title_id'])
+        author_id = self.resolve(User, row['author'])
+        if title_id is None or author_id is None:
+            return None
+        return Review(
+            id=int(row['id']),
+            title_id=title_id,
+            author_id=author_id,
+            text=row['text'],
+            score=int(row['score']),
+            pub_date=parse_datetime(row['pub_date']),
+        )
+
+    def build_comment(self, row):
+        review_id = self.resolve(Review, row['review_id'])
+        author_id = self.resolve(User, row['author'])
+        if review_id is None or author_id is None:
+            return None
+        return Comment(
+            id=int(row['id']),
+            review_id=review_id,
+            author_id=author_id,
+            text=row['text'],
+            pub_date=parse_datetime(row['pub_date']),
+        )
+
+    def read_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, encoding='utf-8') as file:
+            return json.load(file)
+
+    def write_checkpoint(self):
+        with open(self.checkpoint_path, 'w', encoding='utf-8') as file:
+            json.dump(self.done, file)
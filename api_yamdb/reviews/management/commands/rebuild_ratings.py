@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Avg, Count, Sum
+
+from reviews.models import Review, Title, TitleStats
+from reviews.ratings import recount_rating_summary
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает сохранённые средние и взвешенные рейтинги '
+        'и распределения оценок произведений по отзывам.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Сколько произведений обновлять одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        stats = (
+            Review.objects.order_by()
+            .values('title_id')
+            .annotate(
+                rating_sum=Sum('score'),
+                rating_count=Count('id'),
+                rating=Avg('score'),
+            )
+        )
+        updated = 0
+        with transaction.atomic():
+            Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+            batch = []
+            for row in stats.iterator():
+                batch.append(Title(
+                    pk=row['title_id'],
+                    rating_sum=row['rating_sum'],
+                    rating_count=row['rating_count'],
+                    rating=row['rating'],
+                ))
+                if len(batch) >= batch_size:
+                    updated += self.flush(batch)
+            updated += self.flush(batch)
+            recount_rating_summary()
+            self.rebuild_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для {updated} произведений.'
+        ))
+
+    @staticmethod
+    def rebuild_stats():
+        # Размер пачки выбирает Django: явный batch_size в Django 2.2
+        # обходит ограничение SQLite на число строк в одном INSERT.
+        TitleStats.objects.all().delete()
+        stats = (
+            Review.objects.order_by()
+            .values('title_id')
+            .annotate(**TitleStats.aggregates())
+        )
+        TitleStats.objects.bulk_create(
+            TitleStats(**row) for row in stats.iterator()
+        )
+        TitleStats.objects.bulk_create(
+            (
+                TitleStats(title_id=title_id)
+                for title_id in Title.objects.filter(stats__isnull=True)
+                .values_list('id', flat=True).iterator()
+            )
+        )
+
+    @staticmethod
+    def flush(batch):
+        Title.objects.bulk_update(
+            batch, ('rating_sum', 'rating_count', 'rating'))
+        count = len(batch)
+        batch.clear()
+        return count
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from reviews import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает полнотекстовый индекс произведений.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not search.fts_enabled(connection):
+            self.stdout.write(
+                'Полнотекстовый индекс поддерживается только для SQLite.')
+            return
+        with transaction.atomic(using=options['database']):
+            search.create_index(connection)
+        self.stdout.write(self.style.SUCCESS('Индекс пересобран.'))
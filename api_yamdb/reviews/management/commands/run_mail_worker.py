@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди OutgoingEmail пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Сколько писем отправлять через одно соединение.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, когда очередь пуста.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Разобрать очередь и завершиться.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_pending(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, ошибок: {failed}.')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
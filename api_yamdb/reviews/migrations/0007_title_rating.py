@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:24
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def fill_title_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    stats = (
+        Review.objects.order_by()
+        .values('title_id')
+        .annotate(
+            rating_sum=Sum('score'),
+            rating_count=Count('id'),
+            rating=Avg('score'),
+        )
+    )
+    for row in stats:
+        Title.objects.filter(pk=row.pop('title_id')).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_merge_20220703_1243'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_title_rating, migrations.RunPython.noop),
+    ]
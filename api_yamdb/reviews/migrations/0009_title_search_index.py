@@ -0,0 +1,33 @@
+from django.db import migrations
+
+# SQL на момент миграции: reviews.search может меняться дальше.
+CREATE_INDEX = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS reviews_title_fts '
+    'USING fts5(name, description, '
+    "tokenize='unicode61 remove_diacritics 2')",
+    'DELETE FROM reviews_title_fts',
+    'INSERT INTO reviews_title_fts(rowid, name, description) '
+    "SELECT id, name, COALESCE(description, '') FROM reviews_title",
+)
+DROP_INDEX = ('DROP TABLE IF EXISTS reviews_title_fts',)
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        with schema_editor.connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_comment_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(CREATE_INDEX), run(DROP_INDEX)),
+    ]
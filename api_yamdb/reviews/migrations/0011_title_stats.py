@@ -0,0 +1,56 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:51
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+import django.db.models.deletion
+
+
+def fill_title_stats(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    TitleStats = apps.get_model('reviews', 'TitleStats')
+    aggregates = {
+        f'score_{score}': Count('id', filter=Q(score=score))
+        for score in range(1, 11)
+    }
+    stats = {
+        row.pop('title_id'): row
+        for row in Review.objects.order_by().values('title_id').annotate(
+            last_review_date=Max('pub_date'), **aggregates)
+    }
+    TitleStats.objects.bulk_create(
+        TitleStats(title_id=title_id, **stats.get(title_id, {}))
+        for title_id in Title.objects.values_list('id', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_outgoing_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleStats',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='reviews.Title')),
+                ('score_1', models.PositiveIntegerField(default=0)),
+                ('score_2', models.PositiveIntegerField(default=0)),
+                ('score_3', models.PositiveIntegerField(default=0)),
+                ('score_4', models.PositiveIntegerField(default=0)),
+                ('score_5', models.PositiveIntegerField(default=0)),
+                ('score_6', models.PositiveIntegerField(default=0)),
+                ('score_7', models.PositiveIntegerField(default=0)),
+                ('score_8', models.PositiveIntegerField(default=0)),
+                ('score_9', models.PositiveIntegerField(default=0)),
+                ('score_10', models.PositiveIntegerField(default=0)),
+                ('last_review_date', models.DateTimeField(blank=True, null=True, verbose_name='Дата последнего отзыва')),
+            ],
+            options={
+                'verbose_name': 'Статистика произведения',
+                'verbose_name_plural': 'Статистика произведений',
+            },
+        ),
+        migrations.RunPython(fill_title_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:54
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+
+
+def fill_weighted_rating(apps, schema_editor):
+    RatingSummary = apps.get_model('reviews', 'RatingSummary')
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    totals = Review.objects.aggregate(
+        score_sum=Sum('score'), score_count=Count('id'))
+    score_sum = totals['score_sum'] or 0
+    score_count = totals['score_count']
+    mean = score_sum / score_count if score_count else None
+    RatingSummary.objects.create(
+        pk=1, score_sum=score_sum, score_count=score_count, mean=mean)
+    if mean is None:
+        return
+    min_votes = settings.RATING_MIN_VOTES
+    Title.objects.update(weighted_rating=Case(
+        When(rating_count=0, then=Value(None)),
+        default=(
+            (Cast(F('rating_sum'), FloatField()) + mean * min_votes)
+            / (F('rating_count') + min_votes)
+        ),
+        output_field=FloatField(),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('score_count', models.BigIntegerField(default=0)),
+                ('mean', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Сводка оценок',
+                'verbose_name_plural': 'Сводка оценок',
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(blank=True, db_index=True, editable=False, null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-weighted_rating'], name='title_category_weighted_idx'),
+        ),
+        migrations.RunPython(fill_weighted_rating, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.core.validators import (MaxValueValidator,
                                     MinValueValidator
                                     )
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 
 from collections import namedtuple
 
@@ -69,6 +70,14 @@ class User(AbstractUser):
         verbose_name = 'Пользователь'
         verbose_name_plural = 'Пользователи'
 
+    def refresh_from_db(self, using=None, fields=None):
+        # Пользователь из полей токена (api.authentication) при обращении
+        # к любому незагруженному полю загружается целиком.
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred:
+            fields = set(fields) | deferred
+        super().refresh_from_db(using=using, fields=fields)
+
     def is_moderator(self):
         return self.role == ROLES.moderator
 
@@ -138,13 +147,61 @@ class Title(models.Model):
     )
     description = models.TextField(
         verbose_name='Описание', blank=True, null=True)
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
+    weighted_rating = models.FloatField(
+        verbose_name='Взвешенный рейтинг',
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+    )
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['category', '-weighted_rating'],
+                name='title_category_weighted_idx',
+            ),
+        ]
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
 
 
+class RatingSummary(models.Model):
+    """Сумма и количество всех оценок - единственная строка.
+
+    mean - средняя оценка, с которой посчитаны взвешенные рейтинги
+    произведений (reviews.ratings); обновляется, когда фактическая
+    средняя уходит от неё больше чем на RATING_MEAN_TOLERANCE.
+    """
+    PK = 1
+
+    score_sum = models.BigIntegerField(default=0)
+    score_count = models.BigIntegerField(default=0)
+    mean = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Сводка оценок'
+        verbose_name_plural = 'Сводка оценок'
+
+
 class BaseReviewComment(models.Model):
     """Базовая модель ревью и комментариев."""
     author = models.ForeignKey(
@@ -166,6 +223,9 @@ class BaseReviewComment(models.Model):
         return f'{self.pub_date} | {self.author} | {self.text[:15]}'
 
 
+SCORES = range(1, 11)
+
+
 class Review(BaseReviewComment):
     """Отзывы на произведения."""
     title = models.ForeignKey(
@@ -180,6 +240,25 @@ class Review(BaseReviewComment):
         verbose_name='Рейтинг произведения'
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_score()
+        return instance
+
+    def remember_score(self):
+        """Запоминает сохранённые в БД оценку и произведение,
+        чтобы при обновлении отзыва пересчитать рейтинг на разницу."""
+        score = self.__dict__.get('score')
+        self._saved_score = None if score is None else int(score)
+        self._saved_title_id = self.__dict__.get('title_id')
+
+    def save(self, *args, **kwargs):
+        # Рейтинг произведения обновляется в post_save,
+        # поэтому запись отзыва и пересчёт идут в одной транзакции.
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+
     class Meta(BaseReviewComment.Meta):
         default_related_name = 'reviews'
         constraints = [
@@ -188,6 +267,12 @@ class Review(BaseReviewComment):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Ревью'
         verbose_name_plural = 'Ревью'
 
@@ -201,5 +286,147 @@ class Comment(BaseReviewComment):
 
     class Meta(BaseReviewComment.Meta):
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+
+
+class TitleStats(models.Model):
+    """Распределение оценок произведения.
+
+    Счётчики обновляются сигналами отзывов (reviews.signals),
+    пересчитываются командой rebuild_ratings.
+    """
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    score_1 = models.PositiveIntegerField(default=0)
+    score_2 = models.PositiveIntegerField(default=0)
+    score_3 = models.PositiveIntegerField(default=0)
+    score_4 = models.PositiveIntegerField(default=0)
+    score_5 = models.PositiveIntegerField(default=0)
+    score_6 = models.PositiveIntegerField(default=0)
+    score_7 = models.PositiveIntegerField(default=0)
+    score_8 = models.PositiveIntegerField(default=0)
+    score_9 = models.PositiveIntegerField(default=0)
+    score_10 = models.PositiveIntegerField(default=0)
+    last_review_date = models.DateTimeField(
+        verbose_name='Дата последнего отзыва',
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        verbose_name = 'Статистика произведения'
+        verbose_name_plural = 'Статистика произведений'
+
+    @staticmethod
+    def score_field(score):
+        return f'score_{score}'
+
+    @classmethod
+    def aggregates(cls):
+        """Агрегаты для пересчёта по таблице отзывов."""
+        aggregates = {
+            cls.score_field(score): models.Count(
+                'id', filter=models.Q(score=score))
+            for score in SCORES
+        }
+        aggregates['last_review_date'] = models.Max('pub_date')
+        return aggregates
+
+    @classmethod
+    def for_titles(cls, title_ids):
+        """Статистика существующих произведений в порядке title_ids.
+        Строки произведений, добавленных в обход сигналов,
+        создаются по таблице отзывов."""
+        found = {
+            stats.title_id: stats
+            for stats in cls.objects.filter(title_id__in=title_ids)
+        }
+        missing = set(title_ids) - set(found)
+        if missing:
+            titles = Title.objects.filter(pk__in=missing).order_by()
+            for title_id in titles.values_list('pk', flat=True):
+                found[title_id], _ = cls.objects.update_or_create(
+                    title_id=title_id,
+                    defaults=Review.objects.filter(
+                        title_id=title_id).aggregate(**cls.aggregates()),
+                )
+        return [found[pk] for pk in title_ids if pk in found]
+
+    @property
+    def histogram(self):
+        return {
+            score: getattr(self, self.score_field(score)) for score in SCORES
+        }
+
+    @property
+    def count(self):
+        return sum(self.histogram.values())
+
+    @property
+    def mean(self):
+        count = self.count
+        if not count:
+            return None
+        return sum(
+            score * number for score, number in self.histogram.items()
+        ) / count
+
+    @property
+    def median(self):
+        count = self.count
+        if not count:
+            return None
+        middle = ((count - 1) // 2, count // 2)
+        values = []
+        seen = 0
+        for score, number in self.histogram.items():
+            values.extend(
+                score for position in middle
+                if seen <= position < seen + number
+            )
+            seen += number
+        return sum(values) / 2
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Письма отправляет отдельный процесс manage.py run_mail_worker.
+    """
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.EmailField('Отправитель', max_length=EMAIL_LENGTH)
+    to = models.EmailField('Получатель', max_length=EMAIL_LENGTH)
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField(
+        'Отправить не раньше',
+        default=timezone.now,
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        ordering = ('send_after', 'id')
+        indexes = [
+            models.Index(
+                fields=['sent_at', 'send_after'],
+                name='outgoing_email_pending_idx',
+            ),
+        ]
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+
+    def __str__(self):
+        return f'{self.to} | {self.subject}'
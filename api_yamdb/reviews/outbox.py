@@ -0,0 +1,97 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutgoingEmail
+
+
+def enqueue_mail(subject, message, from_email, recipient_list):
+    """Ставит письмо в очередь вместо отправки во время запроса."""
+    OutgoingEmail.objects.bulk_create(
+        OutgoingEmail(
+            subject=subject, body=message, from_email=from_email, to=to)
+        for to in recipient_list
+    )
+
+
+def retry_delay(attempts):
+    """Экспоненциальная пауза перед повторной попыткой отправки."""
+    delay = settings.MAIL_RETRY_DELAY * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.MAIL_RETRY_MAX_DELAY))
+
+
+def pending_mail():
+    return OutgoingEmail.objects.filter(
+        sent_at__isnull=True,
+        send_after__lte=timezone.now(),
+        attempts__lt=settings.MAIL_MAX_ATTEMPTS,
+    )
+
+
+def claim(batch):
+    """Аренда писем: пока пачка отправляется, другие воркеры её не берут.
+
+    Каждая строка захватывается условным UPDATE по прочитанным значениям
+    send_after и attempts: если другой воркер успел взять письмо раньше,
+    строка не обновится, и письмо пропускается.
+    """
+    lease = timezone.now() + timedelta(seconds=settings.MAIL_SEND_TIMEOUT)
+    claimed = []
+    with transaction.atomic():
+        for mail in batch:
+            if OutgoingEmail.objects.filter(
+                pk=mail.pk,
+                sent_at__isnull=True,
+                send_after=mail.send_after,
+                attempts=mail.attempts,
+            ).update(send_after=lease):
+                claimed.append(mail)
+    return claimed
+
+
+def reschedule(mail, error):
+    mail.attempts += 1
+    mail.last_error = repr(error)
+    mail.send_after = timezone.now() + retry_delay(mail.attempts)
+    return mail
+
+
+def deliver_pending(batch_size=100, connection=None):
+    """Отправляет очередную пачку писем через одно соединение с почтовым
+    сервером. Возвращает пару (отправлено, ошибок)."""
+    batch = claim(pending_mail()[:batch_size])
+    if not batch:
+        return 0, 0
+    connection = connection or get_connection(fail_silently=False)
+    sent, failed = [], []
+    try:
+        connection.open()
+    except Exception as error:
+        # Сервер недоступен: вся пачка откладывается как неудачная попытка.
+        failed = [reschedule(mail, error) for mail in batch]
+    else:
+        try:
+            for mail in batch:
+                message = EmailMessage(
+                    subject=mail.subject,
+                    body=mail.body,
+                    from_email=mail.from_email,
+                    to=[mail.to],
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    failed.append(reschedule(mail, error))
+                else:
+                    mail.attempts += 1
+                    mail.sent_at = timezone.now()
+                    sent.append(mail)
+        finally:
+            connection.close()
+    OutgoingEmail.objects.bulk_update(
+        sent + failed, ('attempts', 'last_error', 'send_after', 'sent_at'))
+    return len(sent), len(failed)
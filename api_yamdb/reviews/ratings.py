@@ -0,0 +1,110 @@
+"""Взвешенный рейтинг произведений по формуле IMDb:
+
+    WR = (v * R + m * C) / (v + m) = (сумма оценок + m * C) / (v + m),
+
+где v - число оценок произведения, R - его средняя оценка,
+m - RATING_MIN_VOTES, C - средняя оценка по всем отзывам.
+
+C берётся из RatingSummary.mean и одна для всех произведений, поэтому
+рейтинг произведения пересчитывается тем же UPDATE, что и сумма его
+оценок. Все рейтинги пересчитываются, только когда средняя по отзывам
+ушла от C больше чем на RATING_MEAN_TOLERANCE, и не в транзакции отзыва:
+после её фиксации, пачками по RATING_REFRESH_BATCH произведений.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (Case, Count, F, FloatField, Q, Subquery, Sum,
+                              Value, When)
+from django.db.models.functions import Cast
+
+from .models import RatingSummary, Review, Title
+
+
+def weighted_rating(rating_sum, rating_count):
+    """Выражение взвешенного рейтинга по сумме и количеству оценок."""
+    min_votes = settings.RATING_MIN_VOTES
+    mean = Subquery(
+        RatingSummary.objects.filter(pk=RatingSummary.PK).values('mean'))
+    return (
+        (Cast(rating_sum, FloatField()) + mean * min_votes)
+        / (rating_count + min_votes)
+    )
+
+
+def refresh_weighted_ratings(titles=None):
+    """Пересчитывает взвешенные рейтинги одним UPDATE."""
+    if titles is None:
+        titles = Title.objects.all()
+    return titles.update(weighted_rating=Case(
+        When(rating_count=0, then=Value(None)),
+        default=weighted_rating(F('rating_sum'), F('rating_count')),
+        output_field=FloatField(),
+    ))
+
+
+def refresh_in_batches():
+    """Пересчитывает все взвешенные рейтинги пачками по id, каждая пачка -
+    отдельный UPDATE в своей транзакции, чтобы не держать блокировку
+    записи на всё время пересчёта."""
+    last = 0
+    while True:
+        ids = list(
+            Title.objects.filter(pk__gt=last).order_by('pk')
+            .values_list('pk', flat=True)[:settings.RATING_REFRESH_BATCH])
+        if not ids:
+            return
+        refresh_weighted_ratings(
+            Title.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]))
+        last = ids[-1]
+
+
+def schedule_refresh():
+    """Пересчёт всех рейтингов после фиксации текущей транзакции."""
+    transaction.on_commit(refresh_in_batches)
+
+
+def recount_rating_summary(refresh=True):
+    """Пересчитывает сводку по всем отзывам и, если refresh, все
+    взвешенные рейтинги."""
+    totals = Review.objects.aggregate(
+        score_sum=Sum('score'), score_count=Count('id'))
+    score_sum = totals['score_sum'] or 0
+    score_count = totals['score_count']
+    RatingSummary.objects.update_or_create(pk=RatingSummary.PK, defaults={
+        'score_sum': score_sum,
+        'score_count': score_count,
+        'mean': score_sum / score_count if score_count else None,
+    })
+    if refresh:
+        refresh_weighted_ratings()
+
+
+def change_rating_summary(score_delta, count_delta):
+    """Сдвигает сумму и количество всех оценок. Если средняя ушла от
+    той, с которой посчитаны рейтинги, планирует пересчёт всех рейтингов
+    после фиксации транзакции."""
+    summary = RatingSummary.objects.filter(pk=RatingSummary.PK)
+    if not summary.update(
+        score_sum=F('score_sum') + score_delta,
+        score_count=F('score_count') + count_delta,
+    ):
+        recount_rating_summary(refresh=False)
+        schedule_refresh()
+        return
+    # Без отзывов средней нет; деление на ноль в PostgreSQL - ошибка.
+    actual = Case(
+        When(score_count=0, then=Value(None)),
+        default=Cast(F('score_sum'), FloatField()) / F('score_count'),
+        output_field=FloatField(),
+    )
+    tolerance = settings.RATING_MEAN_TOLERANCE
+    drifted = summary.filter(
+        Q(score_count=0, mean__isnull=False)
+        | Q(score_count__gt=0) & (
+            Q(mean__isnull=True)
+            | Q(mean__lt=actual - tolerance)
+            | Q(mean__gt=actual + tolerance)
+        )
+    ).update(mean=actual)
+    if drifted:
+        schedule_refresh()
@@ -0,0 +1,93 @@
+import re
+
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+WORD = re.compile(r'\w+')
+
+
+def fts_enabled(connection):
+    return connection.vendor == 'sqlite'
+
+
+def create_index(connection):
+    """Создаёт FTS5-индекс по названию и описанию произведений
+    и наполняет его текущими данными."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+            'USING fts5(name, description, '
+            "tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+            "SELECT id, name, COALESCE(description, '') FROM reviews_title"
+        )
+
+
+def drop_index(connection):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def index_title(connection, title):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title.pk])
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE}(rowid, name, description) '
+            'VALUES (%s, %s, %s)',
+            [title.pk, title.name, title.description or ''],
+        )
+
+
+def unindex_title(connection, title_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [title_id])
+
+
+def build_match(text):
+    """Запрос FTS5: все слова обязательны, последнее слово - как префикс.
+    Слова берутся в кавычки, чтобы спецсимволы не ломали синтаксис."""
+    words = WORD.findall(text)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_titles(queryset, text):
+    """Отбирает произведения по словам из text в названии и описании.
+
+    На SQLite ищет по FTS5-индексу и сортирует по релевантности (bm25),
+    на остальных СУБД сводится к поиску подстрок.
+    """
+    match = build_match(text)
+    if not match:
+        return queryset
+    if not fts_enabled(connections[queryset.db]):
+        condition = Q()
+        for word in WORD.findall(text):
+            condition &= (
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset.filter(condition)
+    table = queryset.model._meta.db_table
+    # Не через id__in=RawSQL(...): Django оборачивает RawSQL в скобки,
+    # и SQLite читает IN ((SELECT ...)) как сравнение с одним значением.
+    return queryset.extra(
+        where=[
+            f'{table}.id IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[match],
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT rank FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {table}.id',
+            [match],
+        )
+    ).order_by('search_rank', 'name')
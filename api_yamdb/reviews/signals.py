@@ -0,0 +1,144 @@
+from django.db import connections
+from django.db.models import (Avg, Case, Count, DateTimeField, F, FloatField,
+                              OuterRef, Subquery, Sum, Value, When)
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Review, Title, TitleStats
+from .ratings import (change_rating_summary, recount_rating_summary,
+                      refresh_weighted_ratings, schedule_refresh,
+                      weighted_rating)
+
+
+def change_title_rating(title_id, score_delta, count_delta):
+    """Сдвигает сумму и количество оценок произведения и пересчитывает
+    средний и взвешенный рейтинг одним UPDATE без чтения отзывов."""
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    no_votes = When(rating_count=-count_delta, then=Value(None))
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            no_votes,
+            default=Cast(new_sum, FloatField()) / new_count,
+            output_field=FloatField(),
+        ),
+        weighted_rating=Case(
+            no_votes,
+            default=weighted_rating(new_sum, new_count),
+            output_field=FloatField(),
+        ),
+    )
+
+
+def recount_title_rating(title_id):
+    """Пересчитывает рейтинг произведения по его отзывам."""
+    stats = Review.objects.filter(title_id=title_id).aggregate(
+        rating_sum=Sum('score'),
+        rating_count=Count('id'),
+        rating=Avg('score'),
+    )
+    stats['rating_sum'] = stats['rating_sum'] or 0
+    titles = Title.objects.filter(pk=title_id)
+    titles.update(**stats)
+    refresh_weighted_ratings(titles)
+
+
+def change_title_stats(title_id, changes, pub_date=None):
+    """Сдвигает счётчики оценок произведения ({оценка: изменение})
+    одним UPDATE. С pub_date дата последнего отзыва сдвигается вперёд,
+    без неё - берётся по индексу из оставшихся отзывов."""
+    values = {
+        TitleStats.score_field(score): F(TitleStats.score_field(score)) + delta
+        for score, delta in changes.items()
+        if delta
+    }
+    if pub_date is None:
+        values['last_review_date'] = Subquery(
+            Review.objects.filter(title_id=OuterRef('title_id'))
+            .order_by('-pub_date')
+            .values('pub_date')[:1]
+        )
+    else:
+        values['last_review_date'] = Case(
+            When(last_review_date__gte=pub_date, then=F('last_review_date')),
+            default=Value(pub_date),
+            output_field=DateTimeField(),
+        )
+    # Строки может не быть: произведение добавлено в обход сигналов
+    # (её создаст TitleStats.for_titles) или удаляется каскадом.
+    TitleStats.objects.filter(title_id=title_id).update(**values)
+
+
+def recount_title_stats(title_id):
+    """Пересчитывает распределение оценок произведения по его отзывам."""
+    stats = Review.objects.filter(title_id=title_id).aggregate(
+        **TitleStats.aggregates())
+    TitleStats.objects.filter(title_id=title_id).update(**stats)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    score = int(instance.score)
+    saved_score = getattr(instance, '_saved_score', None)
+    saved_title_id = getattr(instance, '_saved_title_id', None)
+    if created:
+        change_title_rating(instance.title_id, score, 1)
+        change_rating_summary(score, 1)
+        change_title_stats(
+            instance.title_id, {score: 1}, pub_date=instance.pub_date)
+    elif saved_score is None:
+        recount_title_rating(instance.title_id)
+        recount_title_stats(instance.title_id)
+        recount_rating_summary(refresh=False)
+        schedule_refresh()
+    elif saved_title_id != instance.title_id:
+        change_title_rating(saved_title_id, -saved_score, -1)
+        change_title_stats(saved_title_id, {saved_score: -1})
+        change_title_rating(instance.title_id, score, 1)
+        if saved_score != score:
+            change_rating_summary(score - saved_score, 0)
+        change_title_stats(
+            instance.title_id, {score: 1}, pub_date=instance.pub_date)
+    elif saved_score != score:
+        change_title_rating(instance.title_id, score - saved_score, 0)
+        change_rating_summary(score - saved_score, 0)
+        change_title_stats(
+            instance.title_id, {score: 1, saved_score: -1},
+            pub_date=instance.pub_date)
+    instance.remember_score()
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    score = getattr(instance, '_saved_score', None)
+    if score is None:
+        recount_title_rating(instance.title_id)
+        recount_title_stats(instance.title_id)
+        recount_rating_summary(refresh=False)
+        schedule_refresh()
+        return
+    change_title_rating(instance.title_id, -score, -1)
+    change_rating_summary(-score, -1)
+    change_title_stats(instance.title_id, {score: -1})
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, using, raw=False, **kwargs):
+    if created and not raw:
+        TitleStats.objects.using(using).create(title=instance)
+    connection = connections[using]
+    if not raw and search.fts_enabled(connection):
+        search.index_title(connection, instance)
+
+
+@receiver(post_delete, sender=Title)
+def title_deleted(sender, instance, using, **kwargs):
+    connection = connections[using]
+    if search.fts_enabled(connection):
+        search.unindex_title(connection, instance.pk)
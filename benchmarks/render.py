@@ -0,0 +1,90 @@
+"""Время рендеринга страниц TitleSerializer из 5, 100 и 1000 произведений:
+JSONRenderer из DRF и FastJSONRenderer (orjson, если установлен).
+
+Для сравнения приводится и время получения данных страницы из базы:
+через TitleSerializer и через .values() с планом api.values.ValuesPlan.
+Результат печатается в JSON.
+
+    python benchmarks/render.py --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.run import setup_django  # noqa: E402
+
+PAGE_SIZES = (5, 100, 1000)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument(
+        '--repeat', type=int, default=200,
+        help='Повторов для страницы из 5 произведений, для больших '
+             'страниц - пропорционально меньше.')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--reviews-per-title', type=float, default=20)
+    return parser.parse_args(argv)
+
+
+def timed(function, repeat):
+    """Лучшее среднее из трёх серий, мкс."""
+    best = None
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        elapsed = (time.perf_counter() - started) / repeat
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1e6, 1)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='yamdb-render-') as workdir:
+        setup_django(args, workdir)
+        from rest_framework.renderers import JSONRenderer
+
+        from api import renderers
+        from api.serializers import TitleSerializer
+        from api.values import ValuesPlan
+        from reviews.models import Title
+
+        titles = Title.objects.select_related(
+            'category').prefetch_related('genre').order_by('id')
+        plan = ValuesPlan.for_serializer(TitleSerializer)
+        report = {'orjson': renderers.orjson is not None, 'pages': {}}
+        for size in PAGE_SIZES:
+            data = TitleSerializer(titles[:size], many=True).data
+            repeat = max(3, args.repeat * PAGE_SIZES[0] // size)
+            drf = timed(lambda: JSONRenderer().render(data), repeat)
+            fast = timed(
+                lambda: renderers.FastJSONRenderer().render(data), repeat)
+            report['pages'][size] = {
+                'serializer_us': timed(
+                    lambda: TitleSerializer(titles[:size], many=True).data,
+                    max(1, repeat // 10)),
+                'values_plan_us': timed(
+                    lambda: plan.serialize(plan.values(titles)[:size]),
+                    max(1, repeat // 10)),
+                'drf_render_us': drf,
+                'fast_render_us': fast,
+                'render_speedup': round(drf / fast, 1),
+                'bytes': len(JSONRenderer().render(data)),
+            }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
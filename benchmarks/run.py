@@ -0,0 +1,385 @@
+"""Нагрузочный тест API v1.
+
+Поднимает приложение в этом же процессе (wsgiref в отдельном потоке)
+на сгенерированном наборе данных, проигрывает смесь запросов из mix.json
+и печатает пропускную способность и задержки p50/p95/p99 по маршрутам
+в JSON. С ключом --baseline сравнивает результат с сохранённым и
+завершается с ошибкой при регрессии.
+
+    python benchmarks/run.py --requests 2000 --concurrency 4
+    python benchmarks/run.py --update-baseline
+"""
+import argparse
+import http.client
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from socketserver import ThreadingMixIn
+from urllib.parse import quote
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path[:0] = [os.path.join(ROOT, 'api_yamdb'), ROOT]
+
+DATA_DIR = os.path.join(HERE, '.data')
+BASELINE = os.path.join(HERE, 'baseline.json')
+MIX = os.path.join(HERE, 'mix.json')
+SAMPLE_SIZE = 5000
+WRITERS = 50
+
+
+class Server(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--mix', default=MIX)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--reviews-per-title', type=float, default=20)
+    parser.add_argument('--output', help='Куда сохранить отчёт.')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--no-compare', action='store_true')
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument(
+        '--metric', default='p50_ms', choices=('p50_ms', 'p95_ms', 'p99_ms'),
+        help='Какую задержку сравнивать с baseline.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.25,
+        help='Допустимое ухудшение задержки и пропускной способности, доля.')
+    parser.add_argument(
+        '--slack-ms', type=float, default=2.0,
+        help='Рост задержки меньше этого значения не считается регрессией.')
+    return parser.parse_args(argv)
+
+
+def pristine_path(args):
+    return os.path.join(DATA_DIR, 'bench-{}-{}-{}-{}.sqlite3'.format(
+        args.seed, args.titles, args.users, args.reviews_per_title))
+
+
+def setup_django(args, workdir):
+    """Копирует подготовленную базу во временный каталог, а если её ещё
+    нет - создаёт и заполняет через generate_dataset."""
+    pristine = pristine_path(args)
+    database = os.path.join(workdir, 'db.sqlite3')
+    os.environ['BENCH_DB'] = database
+    os.environ['BENCH_METRICS_DIR'] = os.path.join(workdir, 'metrics')
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.settings'
+    if os.path.exists(pristine):
+        shutil.copyfile(pristine, database)
+
+    import django
+    django.setup()
+    from django.core.management import call_command
+    from django.db import connections
+
+    # Сохранённая база могла быть создана до новых миграций.
+    call_command('migrate', verbosity=0)
+    if not os.path.exists(pristine):
+        call_command(
+            'generate_dataset',
+            '--seed', str(args.seed),
+            '--titles', str(args.titles),
+            '--users', str(args.users),
+            '--reviews-per-title', str(args.reviews_per_title),
+        )
+        connections.close_all()
+        os.makedirs(DATA_DIR, exist_ok=True)
+        shutil.copyfile(database, pristine)
+
+
+class Dataset:
+    """Значения для подстановки в пути и тела запросов смеси."""
+
+    def __init__(self, rng):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from reviews.models import (ROLES, Category, Comment, Genre, Review,
+                                    Title, User)
+        from reviews.management.commands.generate_dataset import WORDS
+
+        self.words = WORDS
+        self.categories = list(Category.objects.values_list('slug', flat=True))
+        self.genres = list(Genre.objects.values_list('slug', flat=True))
+        self.titles = list(Title.objects.values_list('id', flat=True))
+        self.pages = max(1, len(self.titles) // 5)
+        self.reviews = list(
+            Review.objects.order_by('?')
+            .values_list('title_id', 'id')[:SAMPLE_SIZE]
+        )
+        self.comments = list(
+            Comment.objects.order_by('?')
+            .values_list('review__title_id', 'review_id')[:SAMPLE_SIZE]
+        )
+        reader = User.objects.filter(role=ROLES.user).first()
+        admin, _ = User.objects.get_or_create(
+            username='bench-admin',
+            defaults={'email': 'bench-admin@bench.fake', 'role': ROLES.admin},
+        )
+        self.tokens = {
+            'reader': str(AccessToken.for_user(reader)),
+            'admin': str(AccessToken.for_user(admin)),
+        }
+        # Авторы новых отзывов: у них нет отзывов, поэтому пары
+        # (автор, произведение) не повторяются, пока не кончатся.
+        writers = User.objects.bulk_create(
+            User(username=f'bench-writer-{number}',
+                 email=f'bench-writer-{number}@bench.fake')
+            for number in range(WRITERS)
+        )
+        writers = User.objects.filter(username__startswith='bench-writer-')
+        writer_tokens = [str(AccessToken.for_user(user)) for user in writers]
+        titles = list(self.titles)
+        rng.shuffle(titles)
+        self.writes = itertools.product(titles, writer_tokens)
+        self.signups = itertools.count()
+        self.lock = threading.Lock()
+
+    def pick(self, key, rng):
+        if key in ('review_title', 'review'):
+            title, review = rng.choice(self.reviews)
+            return {'review_title': title, 'review': review}
+        if key in ('comment_title', 'comment_review'):
+            title, review = rng.choice(self.comments)
+            return {'comment_title': title, 'comment_review': review}
+        if key in ('write_title', 'writer'):
+            with self.lock:
+                title, token = next(self.writes)
+            return {'write_title': title, 'writer': token}
+        if key == 'signup':
+            with self.lock:
+                return {'signup': f'bench-signup-{next(self.signups)}'}
+        if key in self.tokens:
+            return {key: self.tokens[key]}
+        choices = {
+            'category': lambda: rng.choice(self.categories),
+            'genre': lambda: rng.choice(self.genres),
+            'title': lambda: rng.choice(self.titles),
+            'page': lambda: rng.randint(1, min(self.pages, 20)),
+            'word': lambda: rng.choice(self.words),
+            'score': lambda: rng.randint(1, 10),
+        }
+        return {key: choices[key]()}
+
+
+class Sample(dict):
+    """Значения одного запроса: связанные значения (произведение и его
+    отзыв) выбираются вместе при первом обращении к любому из них."""
+
+    def __init__(self, dataset, rng):
+        super().__init__()
+        self.dataset = dataset
+        self.rng = rng
+
+    def __missing__(self, key):
+        self.update(self.dataset.pick(key, self.rng))
+        return self[key]
+
+
+class Quoted:
+    """Подстановка значений в путь с кодированием для URL."""
+
+    def __init__(self, sample):
+        self.sample = sample
+
+    def __getitem__(self, key):
+        return quote(str(self.sample[key]))
+
+
+def build_request(scenario, dataset, rng):
+    sample = Sample(dataset, rng)
+    path = scenario['path'].format_map(Quoted(sample))
+    headers = {}
+    body = None
+    if scenario.get('auth'):
+        headers['Authorization'] = f'Bearer {sample[scenario["auth"]]}'
+    if 'body' in scenario:
+        body = json.dumps({
+            name: value.format_map(sample)
+            for name, value in scenario['body'].items()
+        }).encode()
+        headers['Content-Type'] = 'application/json'
+    return scenario.get('method', 'GET'), path, body, headers
+
+
+def replay(port, mix, dataset, total, concurrency, seed):
+    """Выполняет total запросов в concurrency потоков.
+    Возвращает задержки и ошибки по сценариям и общее время."""
+    names = list(mix)
+    weights = [mix[name]['weight'] for name in names]
+    counter = itertools.count()
+    latencies = {name: [] for name in names}
+    errors = {name: [] for name in names}
+
+    def client(number):
+        rng = random.Random(seed * 1000 + number)
+        while next(counter) < total:
+            name = rng.choices(names, weights)[0]
+            scenario = mix[name]
+            method, path, body, headers = build_request(
+                scenario, dataset, rng)
+            connection = http.client.HTTPConnection('127.0.0.1', port)
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except OSError as error:
+                status = repr(error)
+            finally:
+                connection.close()
+            latencies[name].append(time.perf_counter() - started)
+            if status != scenario.get('status', 200):
+                errors[name].append(f'{method} {path}: {status}')
+
+    threads = [
+        threading.Thread(target=client, args=(number,))
+        for number in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+
+def percentile(values, share):
+    """Процентиль по ближайшему рангу."""
+    rank = max(0, int(round(share * len(values) + 0.5)) - 1)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarize(latencies, errors, elapsed):
+    routes = {}
+    for name, values in latencies.items():
+        if not values:
+            continue
+        values = sorted(values)
+        routes[name] = {
+            'requests': len(values),
+            'errors': len(errors[name]),
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(values, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(values, 0.99) * 1000, 2),
+        }
+    count = sum(route['requests'] for route in routes.values())
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'requests': count,
+        'rps': round(count / elapsed, 1),
+        'routes': routes,
+    }
+
+
+def compare(report, baseline, mix, args):
+    """Список регрессий относительно baseline. Задержка сравнивается
+    по args.metric: p95 при параллельных клиентах зависит от очереди
+    за самыми медленными запросами и слишком шумный для проверки."""
+    problems = []
+    metric = args.metric
+    for name, route in report['routes'].items():
+        if route['errors']:
+            problems.append(f'{name}: {route["errors"]} ошибок')
+        base = baseline['routes'].get(name)
+        if base is None:
+            continue
+        tolerance = mix.get(name, {}).get('tolerance', args.tolerance)
+        limit = max(base[metric] * (1 + tolerance),
+                    base[metric] + args.slack_ms)
+        if route[metric] > limit:
+            problems.append(
+                f'{name}: {metric} {route[metric]} мс, '
+                f'в baseline {base[metric]} мс'
+            )
+    if report['rps'] < baseline['rps'] * (1 - args.tolerance):
+        problems.append(
+            f'пропускная способность {report["rps"]} запросов/с, '
+            f'в baseline {baseline["rps"]}'
+        )
+    return problems
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with open(args.mix, encoding='utf-8') as file:
+        mix = json.load(file)
+    with tempfile.TemporaryDirectory(prefix='yamdb-bench-') as workdir:
+        setup_django(args, workdir)
+        from django.core.wsgi import get_wsgi_application
+        from django.db import connections
+
+        dataset = Dataset(random.Random(args.seed))
+        connections.close_all()
+        server = Server(('127.0.0.1', 0), QuietHandler)
+        server.set_app(get_wsgi_application())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        port = server.server_address[1]
+        try:
+            if args.warmup:
+                replay(port, mix, dataset, args.warmup, args.concurrency,
+                       args.seed + 1)
+            latencies, errors, elapsed = replay(
+                port, mix, dataset, args.requests, args.concurrency,
+                args.seed)
+        finally:
+            server.shutdown()
+            server.server_close()
+            connections.close_all()
+
+    report = summarize(latencies, errors, elapsed)
+    report['config'] = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'seed': args.seed,
+        'titles': args.titles,
+        'users': args.users,
+        'reviews_per_title': args.reviews_per_title,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    for name, messages in errors.items():
+        for message in messages[:3]:
+            print(f'{name}: {message}', file=sys.stderr)
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+        return 0
+    if args.no_compare or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    problems = compare(report, baseline, mix, args)
+    for problem in problems:
+        print(f'РЕГРЕССИЯ: {problem}', file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,27 @@
+"""Настройки для нагрузочного теста: отдельная база, без ограничения
+частоты запросов и без отправки писем."""
+import os
+
+from api_yamdb.settings import *  # noqa: F401,F403
+from api_yamdb.settings import DATABASES, REST_FRAMEWORK
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost', 'testserver']
+
+DATABASES['default']['NAME'] = os.environ['BENCH_DB']
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_THROTTLE_CLASSES': [],
+}
+
+if os.environ.get('BENCH_SQLITE_PRAGMAS') == 'off':
+    SQLITE_PRAGMAS = {}
+
+EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+METRICS_DIR = os.environ['BENCH_METRICS_DIR']
+
+VERSIONS_DB = os.path.join(
+    os.path.dirname(os.environ['BENCH_DB']), 'versions.sqlite3')
@@ -0,0 +1,187 @@
+"""Пропускная способность SQLite при нескольких процессах-воркерах
+без профиля SQLITE_PRAGMAS и с ним.
+
+Каждый процесс поднимает приложение, как отдельный воркер gunicorn,
+и выполняет запросы через django.test.Client: читатели листают отзывы,
+писатели публикуют новые. Для каждого профиля берётся свежая копия
+базы. Результат печатается в JSON.
+
+    python benchmarks/sqlite_workers.py --readers 4 --writers 2 --duration 10
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.run import percentile, setup_django  # noqa: E402
+
+PROFILES = ('off', 'on')
+USERS_PER_WRITER = 5
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--titles', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=2000)
+    parser.add_argument('--reviews-per-title', type=float, default=20)
+    parser.add_argument('--output', help='Куда сохранить отчёт.')
+    return parser.parse_args(argv)
+
+
+def prepare(rng, writers):
+    """Токены читателя и писателей, перемешанные id произведений."""
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from reviews.models import ROLES, Title, User
+
+    titles = list(Title.objects.values_list('id', flat=True))
+    rng.shuffle(titles)
+    reader = User.objects.filter(role=ROLES.user).first()
+    tokens = []
+    for number in range(writers * USERS_PER_WRITER):
+        username = f'bench-worker-{number}'
+        user, _ = User.objects.get_or_create(
+            username=username, email=f'{username}@bench.fake')
+        tokens.append(str(AccessToken.for_user(user)))
+    return str(AccessToken.for_user(reader)), tokens, titles
+
+
+def worker(role, number, env, token, titles, tokens, start, duration,
+           results):
+    os.environ.update(env)
+    import django
+    django.setup()
+    from django.test import Client
+
+    rng = random.Random(number)
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    clients = [
+        Client(HTTP_AUTHORIZATION=f'Bearer {writer}') for writer in tokens
+    ]
+    # Писатель публикует отзывы от своих пользователей на все
+    # произведения по очереди, пары (автор, произведение) не повторяются.
+    writes = itertools.product(titles, clients)
+    latencies = []
+    errors = {}
+    time.sleep(max(0, start - time.time()))
+    deadline = start + duration
+    while time.time() < deadline:
+        started = time.perf_counter()
+        try:
+            if role == 'reader':
+                response = client.get(
+                    f'/api/v1/titles/{rng.choice(titles)}/reviews/'
+                    f'?page={rng.randint(1, 3)}')
+                expected = (200, 404)
+            else:
+                title, author = next(writes)
+                response = author.post(
+                    f'/api/v1/titles/{title}/reviews/',
+                    {'text': 'Отзыв из нагрузочного теста', 'score': 7},
+                )
+                expected = (201,)
+            status = response.status_code
+            error = None if status in expected else f'HTTP {status}'
+        except Exception as exception:
+            error = type(exception).__name__ + ': ' + str(exception)[:60]
+        latencies.append(time.perf_counter() - started)
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+    results.put((role, latencies, errors))
+
+
+def run_profile(profile, database, args, workdir, reader, writers, titles):
+    env = {
+        'BENCH_DB': database,
+        'BENCH_METRICS_DIR': os.path.join(workdir, 'metrics'),
+        'BENCH_SQLITE_PRAGMAS': profile,
+        'DJANGO_SETTINGS_MODULE': 'benchmarks.settings',
+    }
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    start = time.time() + 3
+    processes = []
+    roles = ['reader'] * args.readers + ['writer'] * args.writers
+    for number, role in enumerate(roles):
+        writer = number - args.readers
+        tokens = writers[
+            writer * USERS_PER_WRITER:(writer + 1) * USERS_PER_WRITER
+        ] if role == 'writer' else []
+        processes.append(context.Process(target=worker, args=(
+            role, number, env, reader, titles, tokens, start,
+            args.duration, results,
+        )))
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    report = {}
+    for role in ('reader', 'writer'):
+        latencies = sorted(itertools.chain.from_iterable(
+            values for name, values, _ in collected if name == role))
+        errors = {}
+        for name, _, role_errors in collected:
+            if name != role:
+                continue
+            for error, number in role_errors.items():
+                errors[error] = errors.get(error, 0) + number
+        failed = sum(errors.values())
+        report[role + 's'] = {
+            'processes': roles.count(role),
+            'requests': len(latencies),
+            'ok_per_s': round((len(latencies) - failed) / args.duration, 1),
+            'errors': errors,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 2)
+            if latencies else None,
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2)
+            if latencies else None,
+        }
+    return report
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='yamdb-bench-') as workdir:
+        # База готовится без профиля, чтобы копии начинали
+        # в обычном режиме журнала.
+        os.environ['BENCH_SQLITE_PRAGMAS'] = 'off'
+        setup_django(args, workdir)
+        from django.db import connections
+
+        reader, writers, titles = prepare(
+            random.Random(args.seed), args.writers)
+        connections.close_all()
+        source = os.path.join(workdir, 'db.sqlite3')
+        report = {'duration_s': args.duration, 'profiles': {}}
+        for profile in PROFILES:
+            database = os.path.join(workdir, f'{profile}.sqlite3')
+            shutil.copyfile(source, database)
+            report['profiles'][profile] = run_profile(
+                profile, database, args, workdir, reader, writers, titles)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Стоимость проверки ограничения частоты запросов: AnonRateThrottle
+из DRF на кэше процесса и SharedAnonRateThrottle на общем файле SQLite.
+
+Для каждого класса замеряется время одной проверки для одного клиента
+(история DRF растёт с каждым запросом) и для многих клиентов, затем
+несколько процессов одновременно расходуют общий лимит: с общим
+хранилищем лимит соблюдается для всех процессов вместе. Результат
+печатается в JSON.
+
+    python benchmarks/throttle.py --checks 20000 --processes 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+API_DIR = os.path.join(ROOT, 'api_yamdb')
+if API_DIR not in sys.path:
+    sys.path.insert(0, API_DIR)
+
+CLASSES = {
+    'drf': 'rest_framework.throttling.AnonRateThrottle',
+    'shared': 'api.throttling.SharedAnonRateThrottle',
+}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--checks', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=1000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument(
+        '--limit', type=int, default=1000,
+        help='Лимит в час для проверки в нескольких процессах.')
+    return parser.parse_args(argv)
+
+
+def setup_django(throttle_db, rate):
+    import django
+    from django.conf import settings
+
+    settings.configure(
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 1000000},
+        }},
+        REST_FRAMEWORK={'DEFAULT_THROTTLE_RATES': {'anon': rate}},
+        THROTTLE_DB=throttle_db,
+        THROTTLE_PURGE_INTERVAL=60,
+    )
+    django.setup()
+
+
+def make_throttle(name):
+    from django.utils.module_loading import import_string
+
+    return import_string(CLASSES[name])
+
+
+def requests(count, clients):
+    user = SimpleNamespace(is_authenticated=False)
+    return [
+        SimpleNamespace(user=user, META={
+            'REMOTE_ADDR': f'10.0.{number // 256 % 256}.{number % 256}',
+        })
+        for number in (index % clients for index in range(count))
+    ]
+
+
+def measure(name, count, clients):
+    throttle_class = make_throttle(name)
+    batch = requests(count, clients)
+    started = time.perf_counter()
+    for request in batch:
+        throttle_class().allow_request(request, None)
+    return round((time.perf_counter() - started) / count * 1e6, 2)
+
+
+def spend(name, throttle_db, rate, count, results):
+    setup_django(throttle_db, rate)
+    throttle_class = make_throttle(name)
+    batch = requests(count, 1)
+    started = time.perf_counter()
+    allowed = sum(
+        throttle_class().allow_request(request, None) for request in batch)
+    results.put((allowed, time.perf_counter() - started))
+
+
+def run_processes(name, throttle_db, args):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    count = args.limit
+    processes = [
+        context.Process(target=spend, args=(
+            name, throttle_db, f'{args.limit}/hour', count, results))
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = max(seconds for _, seconds in collected)
+    return {
+        'limit': args.limit,
+        'attempts': count * args.processes,
+        'allowed': sum(allowed for allowed, _ in collected),
+        'checks_per_s': round(count * args.processes / elapsed),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix='yamdb-throttle-') as workdir:
+        throttle_db = os.path.join(workdir, 'throttle.sqlite3')
+        setup_django(throttle_db, f'{args.checks * 10}/hour')
+        report = {}
+        for name in CLASSES:
+            report[name] = {
+                'one_client_us': measure(name, args.checks, 1),
+                'many_clients_us': measure(name, args.checks, args.clients),
+                'processes': run_processes(
+                    name, os.path.join(workdir, f'{name}.sqlite3'), args),
+            }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+
+    for cache in caches.all():
+        cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def throttle_db(settings, tmp_path):
+    settings.THROTTLE_DB = str(tmp_path / 'throttle.sqlite3')
+    return settings.THROTTLE_DB
+
+
+@pytest.fixture(autouse=True)
+def versions_db(settings, tmp_path):
+    settings.VERSIONS_DB = str(tmp_path / 'versions.sqlite3')
+    return settings.VERSIONS_DB
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    from api.db import connection_stats
+    from api.metrics import store
+
+    settings.METRICS_DIR = str(tmp_path / 'metrics')
+    store.reset()
+    connection_stats.reset()
+    return settings.METRICS_DIR
@@ -0,0 +1,217 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews, create_titles
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_reviews(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        title = Title.objects.get(pk=title_id)
+        assert (title.rating_sum, title.rating_count) == (12, 3), (
+            'Проверьте, что при создании отзыва обновляются сумма и количество оценок произведения'
+        )
+        assert title.rating == 4, (
+            'Проверьте, что при создании отзыва пересчитывается рейтинг произведения'
+        )
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/', data={'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count) == (18, 3), (
+            'Проверьте, что при изменении оценки в отзыве пересчитывается рейтинг произведения'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/')
+        title.refresh_from_db()
+        assert (title.rating_sum, title.rating_count, title.rating) == (13, 2, 6.5), (
+            'Проверьте, что при удалении отзыва пересчитывается рейтинг произведения'
+        )
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json().get('rating') == 6, (
+            'Проверьте, что `rating` произведения берётся из сохранённого значения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_rebuild_ratings(self, admin_client, admin):
+        from reviews.models import Title
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        Title.objects.update(rating_sum=0, rating_count=0, rating=None)
+        call_command('rebuild_ratings')
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count, title.rating) == (12, 3, 4), (
+            'Проверьте, что команда `rebuild_ratings` пересчитывает рейтинг произведений'
+        )
+        empty = Title.objects.get(pk=titles[1]['id'])
+        assert empty.rating is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_ordering_by_rating(self, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        response = admin_client.get('/api/v1/titles/?ordering=-rating')
+        assert response.status_code == 200, (
+            'Проверьте, что произведения можно сортировать по `rating`'
+        )
+        response = admin_client.get('/api/v1/titles/?rating_min=4')
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [titles[0]['id']], (
+            'Проверьте, что произведения можно фильтровать по `rating_min`'
+        )
+
+
+def review_titles(admin_client, django_user_model, scores):
+    """Произведения с отзывами: scores - список оценок каждого произведения."""
+    titles, _, _ = create_titles(admin_client)
+    response = admin_client.post('/api/v1/titles/', data={
+        'name': 'Третье', 'year': 2010, 'genre': ['horror'], 'category': 'films',
+    })
+    titles.append({'id': response.json()['id']})
+    authors = [
+        auth_client(django_user_model.objects.create(
+            username=f'voter{number}', email=f'voter{number}@yamdb.fake'))
+        for number in range(max(len(title_scores) for title_scores in scores))
+    ]
+    for title, title_scores in zip(titles, scores):
+        for author, score in zip(authors, title_scores):
+            author.post(f'/api/v1/titles/{title["id"]}/reviews/', data={'text': 'Оценка', 'score': score})
+    return [title['id'] for title in titles]
+
+
+class Test08WeightedRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_weighted_rating(self, client, admin_client, django_user_model, settings):
+        from reviews.models import Title
+
+        settings.RATING_MIN_VOTES = 10
+        ids = review_titles(admin_client, django_user_model, [[9] * 5, [10], [2] * 5])
+        mean = 65 / 11
+        expected = {
+            ids[0]: (45 + 10 * mean) / 15,
+            ids[1]: (10 + 10 * mean) / 11,
+            ids[2]: (10 + 10 * mean) / 15,
+        }
+        stored = dict(Title.objects.values_list('id', 'weighted_rating'))
+        for title_id, value in expected.items():
+            assert stored[title_id] == pytest.approx(value), (
+                'Проверьте, что взвешенный рейтинг считается по формуле '
+                '(сумма оценок + m * C) / (количество оценок + m)'
+            )
+
+        response = client.get('/api/v1/titles/?ordering=-rating')
+        assert [title['id'] for title in response.json()['results']] == [ids[1], ids[0], ids[2]]
+        response = client.get('/api/v1/titles/?ordering=-weighted_rating')
+        assert [title['id'] for title in response.json()['results']] == [ids[0], ids[1], ids[2]], (
+            'Проверьте, что произведения можно сортировать по `weighted_rating` и что '
+            'единственная высокая оценка не поднимает произведение на первое место'
+        )
+        assert response.json()['results'][0]['weighted_rating'] == pytest.approx(expected[ids[0]])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_top_titles(self, client, admin_client, django_user_model):
+        ids = review_titles(admin_client, django_user_model, [[9] * 5, [10], [2] * 5])
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200, (
+            'Проверьте, что `/api/v1/titles/top/` доступен без токена'
+        )
+        assert [title['id'] for title in response.json()] == [ids[0], ids[1], ids[2]]
+        cases = {
+            '?category=films': [ids[0], ids[2]],
+            '?genre=drama': [ids[1]],
+            '?genre=horror&category=films&limit=1': [ids[0]],
+        }
+        for query, expected in cases.items():
+            response = client.get(f'/api/v1/titles/top/{query}')
+            assert [title['id'] for title in response.json()] == expected, (
+                f'Проверьте фильтрацию `/api/v1/titles/top/{query}`'
+            )
+
+        admin_client.delete(
+            f'/api/v1/titles/{ids[1]}/reviews/{client.get(f"/api/v1/titles/{ids[1]}/reviews/").json()["results"][0]["id"]}/'
+        )
+        response = client.get('/api/v1/titles/top/')
+        assert [title['id'] for title in response.json()] == [ids[0], ids[2]], (
+            'Проверьте, что произведения без отзывов не попадают в `/api/v1/titles/top/`'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_refresh_after_commit(self, admin_client, django_user_model, settings):
+        from django.db import transaction
+        from reviews.models import Review, Title
+
+        settings.RATING_MIN_VOTES = 10
+        settings.RATING_REFRESH_BATCH = 1
+        ids = review_titles(admin_client, django_user_model, [[9] * 5, [10], [2] * 5])
+        before = dict(Title.objects.values_list('id', 'weighted_rating'))
+        author = django_user_model.objects.create(username='drift', email='drift@yamdb.fake')
+        with transaction.atomic():
+            Review.objects.create(title_id=ids[2], author=author, text='Сдвиг', score=1)
+            assert Title.objects.get(id=ids[0]).weighted_rating == before[ids[0]], (
+                'Проверьте, что все рейтинги не пересчитываются в транзакции отзыва'
+            )
+        mean = 66 / 12
+        assert Title.objects.get(id=ids[0]).weighted_rating == pytest.approx(
+            (45 + 10 * mean) / 15), (
+            'Проверьте, что после сдвига средней рейтинги пересчитываются '
+            'после фиксации транзакции'
+        )
+        assert Title.objects.get(id=ids[1]).weighted_rating == pytest.approx(
+            (10 + 10 * mean) / 11)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_move_review_changes_summary(self, admin_client, django_user_model):
+        from django.db.models import Count, Sum
+        from reviews.models import RatingSummary, Review
+
+        ids = review_titles(admin_client, django_user_model, [[9] * 5, [10], [2] * 5])
+        review = Review.objects.filter(title_id=ids[2]).first()
+        review.title_id, review.score = ids[1], 8
+        review.save()
+        summary = RatingSummary.objects.get()
+        totals = Review.objects.aggregate(score_sum=Sum('score'), score_count=Count('id'))
+        assert (summary.score_sum, summary.score_count) == (
+            totals['score_sum'], totals['score_count']), (
+            'Проверьте, что перенос отзыва с новой оценкой сдвигает сумму всех оценок'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_recount_after_commit(self, admin_client, django_user_model, settings):
+        from django.db import transaction
+        from reviews.models import Review, Title
+
+        settings.RATING_MIN_VOTES = 10
+        ids = review_titles(admin_client, django_user_model, [[9] * 5, [10], [2] * 5])
+        before = Title.objects.get(id=ids[0]).weighted_rating
+        with transaction.atomic():
+            # Без загруженной оценки сигнал пересчитывает сводку целиком.
+            review = Review.objects.only('id', 'title_id', 'author_id', 'text').get(
+                title_id=ids[2], author__username='voter0')
+            review.score = 10
+            review.save()
+            assert Title.objects.get(id=ids[0]).weighted_rating == before, (
+                'Проверьте, что полный пересчёт сводки не обновляет все '
+                'рейтинги в транзакции отзыва'
+            )
+        mean = 73 / 11
+        assert Title.objects.get(id=ids[0]).weighted_rating == pytest.approx(
+            (45 + 10 * mean) / 15)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_delete_last_review(self, admin_client, django_user_model):
+        from reviews.models import RatingSummary, Review
+
+        ids = review_titles(admin_client, django_user_model, [[7]])
+        Review.objects.get(title_id=ids[0]).delete()
+        summary = RatingSummary.objects.get()
+        assert (summary.score_sum, summary.score_count, summary.mean) == (0, 0, None), (
+            'Проверьте, что после удаления последнего отзыва средняя оценка сбрасывается'
+        )
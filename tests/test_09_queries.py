@@ -0,0 +1,139 @@
+import pytest
+
+
+def create_catalogue(size):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name='Ужасы', slug='horror'),
+        Genre.objects.create(name='Комедия', slug='comedy'),
+    ]
+    Title.objects.bulk_create(
+        Title(name=f'Произведение {number}', year=2000, category=category)
+        for number in range(size)
+    )
+    Through = Title.genre.through
+    Through.objects.bulk_create(
+        Through(title_id=title.id, genre_id=genre.id)
+        for title in Title.objects.all()
+        for genre in genres
+    )
+
+
+class Test09TitleQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('page_size', [5, 100])
+    def test_01_title_list_queries(self, client, django_assert_num_queries, page_size):
+        create_catalogue(100)
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?page_size={page_size}')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == page_size, (
+            'Проверьте, что параметр `page_size` задаёт размер страницы `/api/v1/titles/`'
+        )
+        assert all(len(title['genre']) == 2 and title['category'] for title in results), (
+            'Проверьте, что жанры и категория выводятся у каждого произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_queries(self, client, django_assert_num_queries):
+        create_catalogue(1)
+        from reviews.models import Title
+        title_id = Title.objects.get().id
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 2
+
+
+class Test09ReviewQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_review_read_queries(self, client, admin_client, admin, django_assert_num_queries):
+        from .common import create_reviews
+
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{title_id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['results'][0]['author'], (
+            'Проверьте, что автор отзыва загружается вместе со страницей'
+        )
+        with django_assert_num_queries(1):
+            response = client.get(f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/')
+        assert response.status_code == 200
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/{reviews[0]["id"]}/')
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв другого произведения не найден'
+        )
+        response = client.get('/api/v1/titles/999/reviews/')
+        assert response.status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_create_queries(self, admin_client, admin, django_assert_num_queries):
+        from .common import auth_client, create_reviews
+
+        _, titles, _, moderator = create_reviews(admin_client, admin)
+        client = auth_client(moderator)
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        # пользователь, произведение, BEGIN, INSERT, рейтинг, сводка оценок,
+        # проверка сдвига средней (оценка равна средней), статистика оценок
+        with django_assert_num_queries(8):
+            response = client.post(url, data={'text': 'Отзыв', 'score': 4})
+        assert response.status_code == 201
+        # повторный отзыв отсекает ограничение в базе, без отдельной проверки
+        with django_assert_num_queries(4):
+            response = client.post(url, data={'text': 'Отзыв', 'score': 4})
+        assert response.status_code == 400
+        assert response.json() == {'non_field_errors': ['Уже есть ревью на это произведение.']}
+
+
+class Test09CommentQueries:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_comment_read_queries(self, client, admin_client, admin, django_assert_num_queries):
+        from .common import create_comments
+
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.status_code == 200
+        assert {comment['author'] for comment in response.json()['results']} == {
+            comment['author'] for comment in comments
+        }, 'Проверьте, что авторы комментариев загружаются вместе со страницей'
+        # курсорная пагинация не считает общее количество
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}?pagination=cursor')
+        assert len(response.json()['results']) == 3
+        with django_assert_num_queries(1):
+            response = client.get(f'{url}{comments[0]["id"]}/')
+        assert response.status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comment_url_hierarchy(self, client, admin_client, admin):
+        from .common import create_comments
+
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        review_id = reviews[0]['id']
+        other_title = titles[1]['id']
+        url = f'/api/v1/titles/{other_title}/reviews/{review_id}/comments/'
+        for path in (url, f'{url}?pagination=cursor', f'{url}{comments[0]["id"]}/'):
+            response = client.get(path)
+            assert response.status_code == 404, (
+                f'Проверьте, что `{path}` возвращает 404, '
+                'если отзыв не относится к произведению из URL'
+            )
+        response = admin_client.post(url, data={'text': 'Чужой отзыв'})
+        assert response.status_code == 404, (
+            'Проверьте, что нельзя прокомментировать отзыв через чужое произведение'
+        )
+        empty_review = reviews[1]
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/{empty_review["id"]}/comments/')
+        assert response.status_code == 200
+        assert response.json()['results'] == []
@@ -0,0 +1,90 @@
+import pytest
+
+
+def create_title_with_reviews(django_user_model, count):
+    from reviews.models import Comment, Review, Title
+
+    title = Title.objects.create(name='Поворот туда', year=2000)
+    django_user_model.objects.bulk_create(
+        django_user_model(username=f'author{number}', email=f'author{number}@yamdb.fake')
+        for number in range(count)
+    )
+    authors = django_user_model.objects.filter(username__startswith='author')
+    for number, author in enumerate(authors):
+        review = Review.objects.create(title=title, author=author, text=f'Отзыв {number}', score=5)
+        Comment.objects.create(review=review, author=author, text=f'Комментарий {number}')
+    return title
+
+
+def walk(client, url, key):
+    ids = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что при GET запросе `{url}` возвращается статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в режиме `pagination=cursor` не считается общее количество записей'
+        )
+        ids.extend(item['id'] for item in data['results'])
+        url = data[key]
+        pages += 1
+    return ids, pages
+
+
+class Test10CursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_cursor_walk(self, client, django_user_model):
+        from reviews.models import Review
+
+        title = create_title_with_reviews(django_user_model, 12)
+        # одинаковая дата у всех отзывов: порядок держится на id
+        Review.objects.update(pub_date=Review.objects.first().pub_date)
+        expected = list(Review.objects.order_by('-pub_date', '-id').values_list('id', flat=True))
+
+        ids, pages = walk(client, f'/api/v1/titles/{title.id}/reviews/?pagination=cursor', 'next')
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация отзывов проходит все записи '
+            'по порядку (pub_date, id) без пропусков и повторов'
+        )
+        assert pages == 3
+
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/?pagination=cursor')
+        last_page = client.get(client.get(response.json()['next']).json()['next']).json()
+        back_ids, _ = walk(client, last_page['previous'], 'previous')
+        assert back_ids == expected[5:10] + expected[:5], (
+            'Проверьте, что ссылка `previous` курсорной пагинации возвращает предыдущие страницы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_cursor_walk(self, client, django_user_model):
+        from reviews.models import Comment, Review
+
+        title = create_title_with_reviews(django_user_model, 3)
+        review = Review.objects.first()
+        author = django_user_model.objects.first()
+        for number in range(6):
+            Comment.objects.create(review=review, author=author, text=f'Ещё {number}')
+        expected = list(review.comments.order_by('-pub_date', '-id').values_list('id', flat=True))
+
+        url = f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/?pagination=cursor'
+        ids, pages = walk(client, url, 'next')
+        assert ids == expected, (
+            'Проверьте, что курсорная пагинация комментариев проходит все записи по порядку'
+        )
+        assert pages == 2
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_default_pagination_kept(self, client, django_user_model):
+        title = create_title_with_reviews(django_user_model, 6)
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/')
+        assert response.json().get('count') == 6, (
+            'Проверьте, что без параметра `pagination=cursor` используется постраничная пагинация'
+        )
+        response = client.get(f'/api/v1/titles/{title.id}/reviews/?cursor=broken')
+        assert response.status_code == 404, (
+            'Проверьте, что при неверном курсоре возвращается статус 404'
+        )
@@ -0,0 +1,85 @@
+import pytest
+
+from .common import create_categories, create_titles
+
+
+class Test11ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_anonymous_titles_cached(self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            cached = client.get('/api/v1/titles/')
+        assert cached['X-Cache'] == 'HIT', (
+            'Проверьте, что повторный анонимный GET запрос `/api/v1/titles/` берётся из кэша'
+        )
+        assert cached.json() == response.json()
+        assert client.get('/api/v1/titles/?year=2000')['X-Cache'] == 'MISS', (
+            'Проверьте, что параметры запроса входят в ключ кэша'
+        )
+        assert client.get(f'/api/v1/titles/{titles[0]["id"]}/')['X-Cache'] == 'MISS'
+        assert client.get(f'/api/v1/titles/{titles[0]["id"]}/')['X-Cache'] == 'HIT'
+
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Новое имя'})
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response['X-Cache'] == 'MISS' and response.json()['name'] == 'Новое имя', (
+            'Проверьте, что изменение произведения сбрасывает кэш'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_invalidation_by_related_models(self, client, admin_client, user_client):
+        titles, categories, _ = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        user_client.post(f'/api/v1/titles/{titles[0]["id"]}/reviews/', data={'text': 'Отзыв', 'score': 7})
+        response = client.get('/api/v1/titles/')
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кэш произведений'
+        )
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/categories/')
+        admin_client.delete(f'/api/v1/categories/{categories[0]["slug"]}/')
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'MISS'
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS', (
+            'Проверьте, что удаление категории сбрасывает кэш произведений'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_authenticated_not_cached(self, admin_client):
+        create_categories(admin_client)
+        admin_client.get('/api/v1/categories/')
+        response = admin_client.get('/api/v1/categories/')
+        assert 'X-Cache' not in response, (
+            'Проверьте, что ответы авторизованным пользователям не кэшируются'
+        )
+        from api.cache import cache_stats
+        assert cache_stats() == {'hits': 0, 'misses': 0}
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_invalidation_across_processes(self, client, admin_client):
+        import multiprocessing
+
+        from django.db import transaction
+
+        from api.cache import bump_version
+
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        # Запись в другом воркере: у дочернего процесса свой кэш API.
+        process = multiprocessing.get_context('fork').Process(
+            target=bump_version, args=('titles',))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS', (
+            'Проверьте, что изменение в другом процессе сбрасывает кэш'
+        )
+
+        client.get('/api/v1/titles/')
+        with transaction.atomic():
+            bump_version('titles')
+            assert client.get('/api/v1/titles/')['X-Cache'] == 'HIT', (
+                'Проверьте, что поколение сдвигается после фиксации транзакции'
+            )
+        assert client.get('/api/v1/titles/')['X-Cache'] == 'MISS'
@@ -0,0 +1,48 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test12TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_name_and_description(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?search=драма')
+        assert response.status_code == 200
+        assert [title['id'] for title in response.json()['results']] == [titles[1]['id']], (
+            'Проверьте, что параметр `search` ищет слова в описании произведения без учёта регистра'
+        )
+        response = client.get('/api/v1/titles/?search=Поворо')
+        assert [title['id'] for title in response.json()['results']] == [titles[0]['id']], (
+            'Проверьте, что параметр `search` ищет последнее слово по префиксу'
+        )
+        response = client.get('/api/v1/titles/?search="(*')
+        assert response.status_code == 200, (
+            'Проверьте, что спецсимволы в `search` не приводят к ошибке'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'description': 'Комедия положений'})
+        response = client.get('/api/v1/titles/?search=комедия')
+        assert [title['id'] for title in response.json()['results']] == [titles[0]['id']], (
+            'Проверьте, что индекс поиска обновляется при изменении произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        response = client.get('/api/v1/titles/?search=комедия')
+        assert response.json()['results'] == [], (
+            'Проверьте, что удалённое произведение пропадает из поиска'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_ranking(self, client, admin_client):
+        from reviews.models import Title
+
+        Title.objects.create(name='Мир', year=1990, description='Война и мир, мир и война, снова мир')
+        Title.objects.create(name='Атлас', year=1990, description='Немного про мир')
+        response = client.get('/api/v1/titles/?search=мир')
+        assert [title['name'] for title in response.json()['results']] == ['Мир', 'Атлас'], (
+            'Проверьте, что результаты поиска отсортированы по релевантности'
+        )
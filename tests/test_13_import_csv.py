@@ -0,0 +1,90 @@
+import io
+import os
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from .conftest import MANAGE_PATH
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def call_import(*args):
+    call_command('import_csv', *args, stdout=io.StringIO())
+
+
+class Test13ImportCsv:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_import_static_data(self, tmp_path):
+        from reviews.models import Comment, Review, Title, User
+
+        call_import('--path', DATA_PATH, '--chunk-size', '10', '--checkpoint', str(tmp_path / 'state.json'))
+        assert User.objects.count() == 5
+        assert Title.objects.count() == 32
+        assert Review.objects.count() == 72
+        assert Comment.objects.count() == 3
+        review = Review.objects.get(pk=1)
+        assert review.pub_date.year == 2019, (
+            'Проверьте, что `import_csv` сохраняет дату публикации из CSV'
+        )
+        assert Title.objects.get(pk=1).rating_count > 0, (
+            'Проверьте, что после загрузки отзывов пересчитывается рейтинг'
+        )
+        assert not (tmp_path / 'state.json').exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_resume_after_failed_chunk(self, tmp_path):
+        from reviews.models import Category
+
+        data = tmp_path / 'data'
+        data.mkdir()
+        rows = ['id,name,slug'] + [f'{n},Категория {n},cat{n}' for n in range(1, 8)]
+        rows[5] = '5,Сломанная,cat1'
+        (data / 'category.csv').write_text('\n'.join(rows), encoding='utf-8')
+        checkpoint = str(tmp_path / 'state.json')
+
+        with pytest.raises(CommandError):
+            call_import('--path', str(data), '--chunk-size', '2', '--checkpoint', checkpoint)
+        assert Category.objects.count() == 4, (
+            'Проверьте, что порции до сбойной остаются в базе'
+        )
+        rows[5] = '5,Категория 5,cat5'
+        (data / 'category.csv').write_text('\n'.join(rows), encoding='utf-8')
+        call_import('--path', str(data), '--chunk-size', '2', '--checkpoint', checkpoint, '--resume')
+        assert Category.objects.count() == 7, (
+            'Проверьте, что `import_csv --resume` продолжает загрузку со сбойной порции'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_resume_rebuilds_earlier_rows(self, tmp_path):
+        import shutil
+
+        from django.db import connection
+
+        from reviews.models import Review, Title
+        from reviews.search import FTS_TABLE, search_titles
+
+        # Таблицу поиска не очищают между тестами: она не модель Django.
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        data = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data)
+        reviews = (data / 'review.csv').read_text(encoding='utf-8')
+        broken = reviews.replace(',103,10,', ',103,десять,', 1)
+        (data / 'review.csv').write_text(broken, encoding='utf-8')
+        checkpoint = str(tmp_path / 'state.json')
+
+        with pytest.raises(CommandError):
+            call_import('--path', str(data), '--chunk-size', '10', '--checkpoint', checkpoint)
+        assert Review._meta.get_field('pub_date').auto_now_add, (
+            'Проверьте, что после сбоя у pub_date восстанавливается auto_now_add'
+        )
+        (data / 'review.csv').write_text(reviews, encoding='utf-8')
+        call_import('--path', str(data), '--chunk-size', '10', '--checkpoint', checkpoint, '--resume')
+        title = Title.objects.get(pk=1)
+        assert list(search_titles(Title.objects.all(), title.name)), (
+            'Проверьте, что после `--resume` в поиск попадают произведения, '
+            'загруженные прерванной попыткой'
+        )
+        assert title.rating_count == Review.objects.filter(title=title).count()
@@ -0,0 +1,86 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+
+
+class BrokenBackend(EmailBackend):
+
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+class UnreachableBackend(EmailBackend):
+
+    def open(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+
+class Test14MailOutbox:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_only_enqueues(self, client):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import deliver_pending
+
+        response = client.post('/api/v1/auth/signup/', data={'email': 'queue@yamdb.fake', 'username': 'queue'})
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            'Проверьте, что при регистрации письмо не отправляется во время запроса'
+        )
+        assert OutgoingEmail.objects.filter(to='queue@yamdb.fake', sent_at__isnull=True).exists(), (
+            'Проверьте, что при регистрации письмо ставится в очередь'
+        )
+        assert deliver_pending() == (1, 0)
+        assert mail.outbox[0].to == ['queue@yamdb.fake']
+        assert deliver_pending() == (0, 0), (
+            'Проверьте, что отправленное письмо не отправляется повторно'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_with_backoff(self, settings):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import deliver_pending, enqueue_mail
+
+        enqueue_mail('Тема', 'Текст', 'ex@yamail.ru', ['retry@yamdb.fake'])
+        assert deliver_pending(connection=BrokenBackend()) == (0, 1)
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1 and 'SMTP' in email.last_error
+        assert (email.send_after - email.created).total_seconds() >= settings.MAIL_RETRY_DELAY, (
+            'Проверьте, что после ошибки повторная отправка откладывается'
+        )
+        assert deliver_pending() == (0, 0)
+
+        OutgoingEmail.objects.update(send_after=email.created)
+        assert deliver_pending() == (1, 0), (
+            'Проверьте, что письмо отправляется повторно после паузы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_server_unreachable(self, settings):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import deliver_pending, enqueue_mail
+
+        enqueue_mail('Тема', 'Текст', 'ex@yamail.ru', ['a@yamdb.fake', 'b@yamdb.fake'])
+        assert deliver_pending(connection=UnreachableBackend()) == (0, 2), (
+            'Проверьте, что ошибка подключения к почтовому серверу '
+            'не останавливает воркер, а откладывает пачку'
+        )
+        for email in OutgoingEmail.objects.all():
+            assert email.attempts == 1 and 'SMTP' in email.last_error
+            assert (email.send_after - email.created).total_seconds() >= settings.MAIL_RETRY_DELAY
+        assert len(mail.outbox) == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_claimed_once(self):
+        from reviews.models import OutgoingEmail
+        from reviews.outbox import claim, enqueue_mail, pending_mail
+
+        enqueue_mail('Тема', 'Текст', 'ex@yamail.ru', ['a@yamdb.fake', 'b@yamdb.fake'])
+        # Два воркера прочитали одну и ту же пачку.
+        first, second = list(pending_mail()), list(pending_mail())
+        assert len(claim(first)) == 2
+        assert claim(second) == [], (
+            'Проверьте, что письмо, взятое одним воркером, не берёт другой'
+        )
+        assert not pending_mail().exists()
+        assert OutgoingEmail.objects.count() == 2
@@ -0,0 +1,63 @@
+import re
+
+import pytest
+
+from .common import create_comments
+
+# Предельное число SQL-запросов на маршрут при анонимном GET-запросе.
+ROUTE_BUDGETS = {
+    'api:titles-list': 3,
+    'api:titles-detail': 2,
+    'api:categories-list': 2,
+    'api:genres-list': 2,
+    'api:reviews-list': 2,
+    'api:reviews-detail': 1,
+    'api:comments-list': 2,
+    'api:comments-detail': 1,
+}
+
+
+def query_count(response):
+    match = re.search(r'sql;dur=[\d.]+;desc="(\d+) queries"', response['Server-Timing'])
+    assert match, 'Проверьте, что в ответе есть заголовок `Server-Timing` с числом SQL-запросов'
+    return int(match.group(1))
+
+
+class Test15QueryBudget:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_route_budgets(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        urls = {
+            'api:titles-list': '/api/v1/titles/',
+            'api:titles-detail': f'/api/v1/titles/{title_id}/',
+            'api:categories-list': '/api/v1/categories/',
+            'api:genres-list': '/api/v1/genres/',
+            'api:reviews-list': f'/api/v1/titles/{title_id}/reviews/',
+            'api:reviews-detail': f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            'api:comments-list': f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            'api:comments-detail': (
+                f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comments[0]["id"]}/'
+            ),
+        }
+        for route, url in urls.items():
+            response = client.get(url)
+            assert response.status_code == 200
+            assert response.wsgi_request.query_stats['route'] == route
+            assert query_count(response) <= ROUTE_BUDGETS[route], (
+                f'Маршрут `{route}` превысил бюджет в {ROUTE_BUDGETS[route]} SQL-запросов: '
+                f'{query_count(response)}'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_budget_log(self, client, settings, caplog):
+        settings.REQUEST_BUDGET_LOG = True
+        settings.REQUEST_BUDGET_ROUTES = {'api:genres-list': {'QUERIES': 0}}
+        client.get('/api/v1/genres/')
+        assert 'api:genres-list' in caplog.text, (
+            'Проверьте, что запросы сверх бюджета попадают в лог'
+        )
+        caplog.clear()
+        client.get('/api/v1/categories/')
+        assert caplog.text == ''
@@ -0,0 +1,64 @@
+import json
+import os
+
+import pytest
+
+from .common import create_titles
+
+
+class Test16Metrics:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_metrics_access(self, client, user_client, admin_client):
+        assert client.get('/api/metrics').status_code == 401
+        assert user_client.get('/api/metrics').status_code == 403, (
+            'Проверьте, что `/api/metrics` доступен только администратору'
+        )
+        response = admin_client.get('/api/metrics')
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_metrics_labels(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        client.get('/api/v1/titles/0/')
+        body = admin_client.get('/api/metrics').content.decode()
+        labels = 'viewset="TitleViewSet",action="list",status="200",version="v1"'
+        assert f'api_requests_total{{{labels}}} 1' in body, (
+            'Проверьте, что запросы считаются с метками viewset, action, status и version'
+        )
+        assert f'api_request_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in body
+        assert 'action="retrieve",status="404"' in body
+        assert 'viewset="TitleViewSet",action="create",status="201"' in body
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_metrics_merge_processes(self, client, admin_client, metrics_dir):
+        client.get('/api/v1/genres/')
+        os.makedirs(metrics_dir, exist_ok=True)
+        with open(os.path.join(metrics_dir, '1.json'), 'w') as file:
+            json.dump({'series': {'GenreViewSet|list|200|v1': {
+                'count': 4, 'sum': 0.5, 'buckets': [4] + [0] * 10,
+            }}}, file)
+        body = admin_client.get('/api/metrics').content.decode()
+        assert 'api_requests_total{viewset="GenreViewSet",action="list",status="200",version="v1"} 5' in body, (
+            'Проверьте, что метрики суммируются по файлам всех воркеров'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_cache_counters_merge_processes(self, client, admin_client,
+                                               metrics_dir):
+        client.get('/api/v1/genres/')
+        client.get('/api/v1/genres/')
+        os.makedirs(metrics_dir, exist_ok=True)
+        with open(os.path.join(metrics_dir, '1.json'), 'w') as file:
+            json.dump({'series': {}, 'counters': {
+                'api_response_cache_hits_total': 3,
+                'api_response_cache_misses_total': 2,
+            }}, file)
+        body = admin_client.get('/api/metrics').content.decode()
+        assert 'api_response_cache_hits_total 4\n' in body, (
+            'Проверьте, что попадания в кэш суммируются по всем воркерам'
+        )
+        assert 'api_response_cache_misses_total 3\n' in body
@@ -0,0 +1,79 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+
+def generate(*args):
+    call_command(
+        'generate_dataset', '--titles', '30', '--users', '40',
+        '--reviews-per-title', '5', '--comments-per-review', '2',
+        *args, stdout=io.StringIO(),
+    )
+
+
+def snapshot():
+    from reviews.models import Comment, Review
+
+    return (
+        list(Review.objects.order_by('id').values_list('title_id', 'author_id', 'score', 'pub_date')),
+        list(Comment.objects.order_by('id').values_list('review_id', 'author_id', 'text')),
+    )
+
+
+def clear():
+    from reviews.models import Category, Comment, Genre, Review, Title, User
+
+    for model in (Comment, Review, Title, Genre, Category, User):
+        model.objects.all().delete()
+
+
+class Test17GenerateDataset:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_dataset_is_consistent(self):
+        from django.db.models import Count, Sum
+        from reviews.models import Review, Title
+
+        generate('--seed', '1')
+        assert Title.objects.count() == 30
+        assert Review.objects.count() > 0
+        assert not (
+            Review.objects.values('title_id', 'author_id')
+            .annotate(number=Count('id')).filter(number__gt=1).exists()
+        ), 'Проверьте, что `generate_dataset` не создаёт двух отзывов одного автора на произведение'
+        totals = Review.objects.aggregate(score=Sum('score'), number=Count('id'))
+        stored = Title.objects.aggregate(score=Sum('rating_sum'), number=Sum('rating_count'))
+        assert stored == totals, (
+            'Проверьте, что после генерации пересчитывается рейтинг произведений'
+        )
+        assert all(genres for genres in Title.objects.annotate(n=Count('genre')).values_list('n', flat=True))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_same_seed_same_data(self):
+        generate('--seed', '7')
+        first = snapshot()
+        clear()
+        generate('--seed', '7')
+        assert snapshot() == first, (
+            'Проверьте, что при одинаковом `--seed` генерируется тот же набор данных'
+        )
+        clear()
+        generate('--seed', '8')
+        assert snapshot() != first
+
+    @pytest.mark.parametrize('mean', [0.5, 1, 3])
+    def test_03_comments_mean(self, mean):
+        import random
+
+        from reviews.management.commands.generate_dataset import Command
+
+        command = Command()
+        command.rng = random.Random(1)
+        command.text = lambda low, high: ''
+        command.pub_date = lambda: None
+        reviews = 20000
+        comments = sum(1 for _ in command.comments(range(reviews), [1], mean))
+        assert abs(comments / reviews - mean) < 0.05 * mean + 0.02, (
+            'Проверьте, что `--comments-per-review` задаёт среднее число комментариев'
+        )
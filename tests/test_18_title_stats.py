@@ -0,0 +1,103 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_reviews
+
+
+def histogram(**counts):
+    result = {str(score): 0 for score in range(1, 11)}
+    result.update(counts)
+    return result
+
+
+class Test18TitleStats:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_stats_follow_reviews(self, client, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/stats/'
+
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что `{url}` доступен без токена'
+        )
+        data = response.json()
+        assert data['histogram'] == histogram(**{'3': 1, '4': 1, '5': 1}), (
+            'Проверьте, что `stats` возвращает распределение оценок по значениям 1-10'
+        )
+        assert (data['id'], data['count'], data['mean'], data['median']) == (title_id, 3, 4, 4)
+        assert data['last_review_date'] == client.get(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[2]["id"]}/'
+        ).json()['pub_date'], 'Проверьте, что `stats` возвращает дату последнего отзыва'
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/', data={'score': 9}
+        )
+        data = client.get(url).json()
+        assert data['histogram'] == histogram(**{'4': 1, '5': 1, '9': 1}), (
+            'Проверьте, что при изменении оценки обновляется распределение оценок'
+        )
+        assert (data['mean'], data['median']) == (6, 5)
+
+        admin_client.delete(f'/api/v1/titles/{title_id}/reviews/{reviews[2]["id"]}/')
+        data = client.get(url).json()
+        assert (data['count'], data['mean'], data['median']) == (2, 7, 7), (
+            'Проверьте, что при удалении отзыва обновляется статистика'
+        )
+        assert data['last_review_date'] == client.get(
+            f'/api/v1/titles/{title_id}/reviews/{reviews[1]["id"]}/'
+        ).json()['pub_date'], (
+            'Проверьте, что после удаления последнего отзыва дата берётся из оставшихся'
+        )
+
+        empty = client.get(f'/api/v1/titles/{titles[1]["id"]}/stats/').json()
+        assert (empty['count'], empty['mean'], empty['median'], empty['last_review_date']) == (
+            0, None, None, None
+        )
+        assert client.get('/api/v1/titles/999/stats/').status_code == 404
+
+        admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что произведение с отзывами удаляется вместе со статистикой'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_batch_stats(self, client, admin_client, admin, django_assert_num_queries):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        ids = [titles[1]['id'], titles[0]['id']]
+        with django_assert_num_queries(1):
+            response = client.get(f'/api/v1/titles/stats/?ids={ids[0]},{ids[1]}')
+        assert response.status_code == 200
+        response = client.get(f'/api/v1/titles/stats/?ids={ids[0]},{ids[1]},999,{ids[0]}')
+        data = response.json()
+        assert [stats['id'] for stats in data] == ids, (
+            'Проверьте, что `/api/v1/titles/stats/?ids=` возвращает статистику '
+            'существующих произведений в порядке запроса'
+        )
+        assert [stats['count'] for stats in data] == [0, 3]
+        for query in ('', 'ids=', 'ids=1,a', 'ids=' + ','.join(map(str, range(1, 102)))):
+            response = client.get(f'/api/v1/titles/stats/?{query}')
+            assert response.status_code == 400, (
+                f'Проверьте, что `/api/v1/titles/stats/?{query}` возвращает статус 400'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_rebuild_stats(self, client, admin_client, admin):
+        from reviews.models import TitleStats
+
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        TitleStats.objects.all().delete()
+        data = client.get(f'/api/v1/titles/{titles[0]["id"]}/stats/').json()
+        assert data['count'] == 3, (
+            'Проверьте, что статистика произведения без строки TitleStats '
+            'пересчитывается по отзывам'
+        )
+        TitleStats.objects.update(score_5=0)
+        call_command('rebuild_ratings')
+        assert TitleStats.objects.count() == len(titles), (
+            'Проверьте, что `rebuild_ratings` создаёт статистику всех произведений'
+        )
+        assert TitleStats.objects.get(pk=titles[0]['id']).count == 3, (
+            'Проверьте, что `rebuild_ratings` пересчитывает статистику произведений'
+        )
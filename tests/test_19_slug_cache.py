@@ -0,0 +1,92 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+def create_title(admin_client, **data):
+    data = {'name': 'Новое', 'year': 2001, 'category': 'films', 'genre': ['horror', 'comedy'], **data}
+    return admin_client.post('/api/v1/titles/', data=data)
+
+
+class Test19SlugCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_create_without_slug_queries(self, admin_client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = create_title(admin_client)
+        assert response.status_code == 201
+        assert sorted(response.json()['genre']) == ['comedy', 'horror']
+        lookups = [
+            query['sql'] for query in context.captured_queries
+            if re.search(r'"reviews_(category|genre)"\."slug" (=|IN)', query['sql'])
+        ]
+        assert not lookups, (
+            'Проверьте, что категория и жанры при создании произведения '
+            'берутся из кэша slug -> id без запросов к БД'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_filter_by_cached_ids(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/?category=films&genre=horror,drama')
+        assert [title['id'] for title in response.json()['results']] == [titles[0]['id']]
+        count_sql = next(
+            query['sql'] for query in context.captured_queries if 'COUNT(*)' in query['sql']
+        )
+        assert 'reviews_category' not in count_sql and '"reviews_genre"' not in count_sql, (
+            'Проверьте, что фильтры `category` и `genre` используют id из кэша, без JOIN справочников'
+        )
+        response = client.get('/api/v1/titles/?category=FILMS')
+        assert [title['id'] for title in response.json()['results']] == [titles[0]['id']], (
+            'Проверьте, что фильтр `category` по-прежнему не зависит от регистра'
+        )
+        response = client.get('/api/v1/titles/?genre=unknown')
+        assert response.json()['results'] == []
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_invalidation(self, client, admin_client):
+        from api.slugs import SlugMap
+        from reviews.models import Genre
+
+        create_titles(admin_client)
+        other_worker = SlugMap(Genre, 'genres')
+        assert other_worker.get('western') is None
+
+        admin_client.post('/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'})
+        response = create_title(admin_client, genre=['western'])
+        assert response.status_code == 201, (
+            'Проверьте, что новый жанр сразу доступен при создании произведения'
+        )
+        assert other_worker.get('western') == Genre.objects.get(slug='western').id, (
+            'Проверьте, что кэш slug -> id сбрасывается во всех процессах'
+        )
+
+        admin_client.delete('/api/v1/genres/comedy/')
+        response = create_title(admin_client, genre=['comedy'])
+        assert response.status_code == 400, (
+            'Проверьте, что удалённый жанр нельзя указать при создании произведения'
+        )
+        response = create_title(admin_client, category='unknown')
+        assert response.status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_reload_after_ttl(self, settings):
+        from api.slugs import SlugMap
+        from reviews.models import Genre
+
+        settings.SLUG_MAP_TTL = 60
+        genres = SlugMap(Genre, 'genres')
+        assert genres.get('western') is None
+        # bulk_create не отправляет сигналов, поколение не меняется.
+        Genre.objects.bulk_create([Genre(name='Вестерн', slug='western')])
+        assert genres.get('western') is None
+        genres.loaded_at -= 61
+        assert genres.get('western') == Genre.objects.get(slug='western').id, (
+            'Проверьте, что кэш slug -> id перечитывается не реже SLUG_MAP_TTL'
+        )
@@ -0,0 +1,48 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+
+def pragma(connection, name):
+    return connection.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+class Test20SqlitePragmas:
+
+    def test_01_profile_applied(self, tmp_path, settings):
+        from api.db import apply_sqlite_pragmas
+
+        raw = sqlite3.connect(str(tmp_path / 'db.sqlite3'))
+        apply_sqlite_pragmas(sender=None, connection=SimpleNamespace(vendor='sqlite', connection=raw))
+        assert pragma(raw, 'journal_mode') == 'wal', (
+            'Проверьте, что новое соединение с SQLite переводится в режим WAL'
+        )
+        assert pragma(raw, 'synchronous') == 1
+        assert pragma(raw, 'busy_timeout') == settings.SQLITE_PRAGMAS['busy_timeout']
+        assert pragma(raw, 'cache_size') == settings.SQLITE_PRAGMAS['cache_size']
+        assert pragma(raw, 'temp_store') == 2
+        raw.close()
+
+    def test_02_profile_configurable(self, tmp_path, settings):
+        from api.db import apply_sqlite_pragmas
+
+        settings.SQLITE_PRAGMAS = {}
+        raw = sqlite3.connect(str(tmp_path / 'db.sqlite3'))
+        apply_sqlite_pragmas(sender=None, connection=SimpleNamespace(vendor='sqlite', connection=raw))
+        assert pragma(raw, 'journal_mode') == 'delete', (
+            'Проверьте, что пустой `SQLITE_PRAGMAS` отключает профиль'
+        )
+        raw.close()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_hook_connected(self, client, django_assert_num_queries):
+        from django.db import connection
+
+        connection.close()
+        with django_assert_num_queries(1):
+            client.get('/api/v1/genres/')
+        assert pragma(connection.connection, 'temp_store') == 2, (
+            'Проверьте, что профиль применяется к соединениям Django '
+            'и не попадает в счётчик SQL-запросов'
+        )
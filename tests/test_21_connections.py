@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+
+def pool_stats(admin_client):
+    import os
+
+    response = admin_client.get('/api/pool-stats')
+    assert response.status_code == 200
+    return response.json()['workers'][str(os.getpid())]['default']
+
+
+class Test21Connections:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_pool_stats_access(self, client, user_client, admin_client):
+        assert client.get('/api/pool-stats').status_code == 401
+        assert user_client.get('/api/pool-stats').status_code == 403, (
+            'Проверьте, что `/api/pool-stats` доступен только администратору'
+        )
+        response = admin_client.get('/api/pool-stats')
+        assert response.status_code == 200
+        assert 'default' in response.json()['conn_max_age']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_connection_reused(self, client, admin_client):
+        for _ in range(3):
+            client.get('/api/v1/genres/')
+        stats = pool_stats(admin_client)
+        assert stats['requests'] == 4 and stats['reused'] == 4, (
+            'Проверьте, что соединение с базой переиспользуется между запросами'
+        )
+        assert stats['reuse_rate'] == 1.0
+        assert stats['replaced'] == 0
+        assert stats['age_s'] is not None and stats['age_s'] >= 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_broken_connection_replaced(self, client, admin_client, django_assert_num_queries):
+        from django.db import connection
+
+        client.get('/api/v1/genres/')
+        database = connection.connection
+        broken = sqlite3.connect(':memory:')
+        broken.close()
+        connection.connection = broken
+        # проверка соединения идёт мимо счётчика запросов
+        with django_assert_num_queries(1):
+            response = client.get('/api/v1/genres/?page=1')
+        assert response.status_code == 200, (
+            'Проверьте, что разорванное соединение заменяется новым перед запросом'
+        )
+        assert connection.connection is not broken
+        stats = pool_stats(admin_client)
+        assert stats['replaced'] == 1
+        assert stats['opened'] >= 1
+        database.close()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_health_checks_disabled(self, client, settings):
+        from django.db import connection
+
+        settings.DB_HEALTH_CHECKS = False
+        client.get('/api/v1/genres/')
+        database = connection.connection
+        broken = sqlite3.connect(':memory:')
+        broken.close()
+        connection.connection = broken
+        with pytest.raises(Exception):
+            client.get('/api/v1/genres/?page=1')
+        connection.connection = database
@@ -0,0 +1,163 @@
+import sqlite3
+
+import pytest
+
+from .common import create_titles
+
+
+@pytest.fixture
+def replicate(settings, tmp_path):
+    """Реплика - второй файл SQLite. Вызов replicate() копирует в неё
+    основную базу, как догнавшая репликация."""
+    from django.db import connections
+
+    name = str(tmp_path / 'replica.sqlite3')
+    connections.databases['replica'] = {
+        **connections.databases['default'], 'NAME': name, 'TEST': {},
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+
+    def replicate():
+        connections['default'].ensure_connection()
+        target = sqlite3.connect(name)
+        connections['default'].connection.backup(target)
+        target.close()
+        return name
+
+    yield replicate
+    connections['replica'].close()
+    delattr(connections._connections, 'replica')
+    del connections.databases['replica']
+
+
+def count_rows(name, table):
+    database = sqlite3.connect(name)
+    try:
+        return database.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    finally:
+        database.close()
+
+
+class Test22Replicas:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reads_from_replica(self, client, admin_client, replicate):
+        from reviews.models import Category
+
+        create_titles(admin_client)
+        replicate()
+        Category.objects.create(name='Музыка', slug='music')
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert response.json()['count'] == 2, (
+            'Проверьте, что безопасные запросы читают данные с реплики'
+        )
+        response = admin_client.get('/api/v1/categories/')
+        assert response.json()['count'] == 3, (
+            'Проверьте, что после своей записи клиент читает из основной базы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_read_your_writes(self, client, admin_client, user_client, replicate):
+        titles, _, _ = create_titles(admin_client)
+        name = replicate()
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Новинка', 'year': 2021, 'category': 'films', 'genre': ['horror'],
+        })
+        assert response.status_code == 201
+        title_id = response.json()['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        response = user_client.post(url, data={'text': 'Свежий отзыв', 'score': 8})
+        assert response.status_code == 201, (
+            'Проверьте, что запросы на запись читают из основной базы'
+        )
+        response = user_client.get(url)
+        assert response.status_code == 200
+        assert [review['text'] for review in response.json()['results']] == ['Свежий отзыв'], (
+            'Проверьте, что автор сразу видит свой отзыв'
+        )
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что другие клиенты читают с реплики'
+        )
+        assert count_rows(name, 'reviews_review') == 0, (
+            'Проверьте, что запись не попадает в реплику'
+        )
+        assert client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_pin_expires(self, admin_client, user_client, settings, replicate):
+        titles, _, _ = create_titles(admin_client)
+        replicate()
+        settings.REPLICA_PIN_SECONDS = 0
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        assert user_client.post(url, data={'text': 'Отзыв', 'score': 5}).status_code == 201
+        response = user_client.get(url)
+        assert response.json()['results'] == [], (
+            'Проверьте, что по истечении REPLICA_PIN_SECONDS клиент снова читает с реплики'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_pin_shared_by_workers(self, user_client, admin_client, replicate):
+        import multiprocessing
+        from types import SimpleNamespace
+
+        from api.routers import pin_key, pins
+        from reviews.models import Category
+
+        create_titles(admin_client)
+        replicate()
+        Category.objects.create(name='Музыка', slug='music')
+        assert user_client.get('/api/v1/categories/').json()['count'] == 2
+        request = SimpleNamespace(META={
+            'HTTP_AUTHORIZATION': user_client._credentials['HTTP_AUTHORIZATION'],
+        })
+        # Запись клиента обработал другой воркер.
+        process = multiprocessing.get_context('fork').Process(
+            target=pins.pin, args=(pin_key(request), 60))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        assert user_client.get('/api/v1/categories/').json()['count'] == 3, (
+            'Проверьте, что после записи через другой воркер клиент '
+            'читает из основной базы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_no_etag_for_lagging_replica(self, user_client, admin_client, replicate):
+        from .test_23_conditional_get import age_changes
+
+        titles, _, _ = create_titles(admin_client)
+        replicate()
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        admin_client.patch(url, data={'name': 'Новое имя'})
+        response = user_client.get(url)
+        assert response.json()['name'] != 'Новое имя'
+        assert not response.has_header('ETag'), (
+            'Проверьте, что ответ с реплики сразу после изменения '
+            'не получает ETag нового поколения'
+        )
+        replicate()
+        age_changes(60)
+        response = user_client.get(url)
+        assert response.json()['name'] == 'Новое имя' and response.has_header('ETag')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_06_no_caching_for_lagging_replica(self, client, admin_client, replicate):
+        from .test_23_conditional_get import age_changes
+
+        create_titles(admin_client)
+        replicate()
+        assert admin_client.post('/api/v1/categories/', data={
+            'name': 'Музыка', 'slug': 'music'}).status_code == 201
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 2
+        replicate()
+        response = client.get('/api/v1/categories/')
+        assert response.json()['count'] == 3, (
+            'Проверьте, что ответ с реплики сразу после изменения '
+            'не кэшируется под новым поколением'
+        )
+        age_changes(60)
+        assert client.get('/api/v1/categories/')['X-Cache'] == 'MISS'
+        response = client.get('/api/v1/categories/')
+        assert response['X-Cache'] == 'HIT' and response.json()['count'] == 3
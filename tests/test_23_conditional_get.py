@@ -0,0 +1,135 @@
+import pytest
+
+from .common import create_comments, create_reviews, create_titles
+
+
+def assert_not_modified(client, url, django_assert_num_queries, **headers):
+    with django_assert_num_queries(0):
+        response = client.get(url, **headers)
+    assert response.status_code == 304, (
+        f'Проверьте, что `{url}` отвечает 304 на условный запрос без изменений'
+    )
+    return response
+
+
+def age_changes(seconds=2):
+    """Сдвигает время всех изменений в прошлое: Last-Modified не
+    отдаётся, пока идёт секунда изменения."""
+    from api.cache import generations
+
+    generations.connect().execute(
+        'UPDATE generation SET changed = changed - ?', (seconds,))
+
+
+class Test23ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_titles_etag(self, client, admin_client, django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        for url in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/'):
+            client.get(url)
+            age_changes()
+            response = client.get(url)
+            assert response.status_code == 200
+            etag = response['ETag']
+            assert etag.startswith('"') and response.has_header('Last-Modified'), (
+                f'Проверьте, что ответ `{url}` содержит ETag и Last-Modified'
+            )
+            not_modified = assert_not_modified(
+                client, url, django_assert_num_queries, HTTP_IF_NONE_MATCH=etag)
+            assert not_modified['ETag'] == etag
+            assert_not_modified(
+                client, url, django_assert_num_queries,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+            assert client.get(url, HTTP_IF_MODIFIED_SINCE='Mon, 01 Jan 2001 00:00:00 GMT').status_code == 200
+        first = client.get('/api/v1/titles/')['ETag']
+        assert client.get('/api/v1/titles/?ordering=name')['ETag'] != first, (
+            'Проверьте, что ETag зависит от параметров запроса'
+        )
+        admin_client.patch(f'/api/v1/titles/{titles[0]["id"]}/', data={'name': 'Новое имя'})
+        response = client.get('/api/v1/titles/', HTTP_IF_NONE_MATCH=first)
+        assert response.status_code == 200 and response['ETag'] != first, (
+            'Проверьте, что после изменения произведения ETag меняется'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_reviews_etag(self, client, admin_client, admin, django_assert_num_queries):
+        from .common import auth_client
+
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        other_url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        other_etag = client.get(other_url)['ETag']
+        assert_not_modified(client, url, django_assert_num_queries, HTTP_IF_NONE_MATCH=etag)
+        assert_not_modified(
+            client, f'{url}{reviews[0]["id"]}/', django_assert_num_queries,
+            HTTP_IF_NONE_MATCH=client.get(f'{url}{reviews[0]["id"]}/')['ETag'])
+
+        response = auth_client(user).patch(f'{url}{reviews[1]["id"]}/', data={'text': 'Исправлено'})
+        assert response.status_code == 200
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+            'Проверьте, что изменение отзыва меняет ETag списка отзывов'
+        )
+        assert client.get(other_url, HTTP_IF_NONE_MATCH=other_etag).status_code == 304, (
+            'Проверьте, что отзывы другого произведения не теряют ETag'
+        )
+        assert client.get('/api/v1/titles/999/reviews/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_comments_etag(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        etag = client.get(url)['ETag']
+        assert_not_modified(client, url, django_assert_num_queries, HTTP_IF_NONE_MATCH=etag)
+        admin_client.post(url, data={'text': 'Ещё комментарий'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()['count'] == 4, (
+            'Проверьте, что новый комментарий меняет ETag списка комментариев'
+        )
+        etag = response['ETag']
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/')
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 404, (
+            'Проверьте, что после удаления отзыва его комментарии не отдаются как неизменённые'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_last_modified_after_second(self, client, admin_client):
+        from unittest import mock
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        from api.cache import get_last_change
+
+        _, changed = get_last_change('titles')
+        with mock.patch('api.cache.time.time', return_value=changed):
+            response = client.get(url)
+        assert response.status_code == 200 and response.has_header('ETag')
+        assert not response.has_header('Last-Modified'), (
+            'Проверьте, что Last-Modified не отдаётся, пока идёт секунда изменения'
+        )
+        age_changes()
+        last_modified = client.get(url)['Last-Modified']
+        admin_client.patch(url, data={'name': 'Новое имя'})
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == 200 and response.json()['name'] == 'Новое имя'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_author_rename(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{url}{reviews[0]["id"]}/comments/'
+        author = reviews[0]['author']
+        etag = client.get(url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+        response = admin_client.patch(f'/api/v1/users/{author}/', data={'username': 'renamed'})
+        assert response.status_code == 200
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response['ETag'] != etag, (
+            'Проверьте, что смена имени автора меняет ETag отзывов'
+        )
+        assert 'renamed' in [review['author'] for review in response.json()['results']]
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == 200 and response['ETag'] != comments_etag, (
+            'Проверьте, что смена имени автора меняет ETag комментариев'
+        )
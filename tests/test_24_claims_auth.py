@@ -0,0 +1,100 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+def claims_client(client, user):
+    from django.contrib.auth.tokens import default_token_generator
+
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user),
+    })
+    assert response.status_code == 200
+    api_client = APIClient()
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.json()["token"]}')
+    return api_client
+
+
+class Test24ClaimsAuthentication:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_permissions_without_user_query(self, client, admin, admin_client,
+                                               django_assert_num_queries):
+        fast_client = claims_client(client, admin)
+        # count и страница пользователей, без запроса самого администратора
+        with django_assert_num_queries(2):
+            response = fast_client.get('/api/v1/users/')
+        assert response.status_code == 200, (
+            'Проверьте, что права администратора проверяются по полям токена '
+            'без загрузки пользователя из базы'
+        )
+        with django_assert_num_queries(3):
+            admin_client.get('/api/v1/users/')
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_full_row_loaded_lazily(self, client, user, django_assert_num_queries):
+        fast_client = claims_client(client, user)
+        with django_assert_num_queries(1):
+            response = fast_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что остальные поля пользователя загружаются из базы одним запросом'
+        )
+        response = fast_client.patch('/api/v1/users/me/', data={'bio': 'Новая биография'})
+        assert response.status_code == 200
+        user.refresh_from_db()
+        assert user.bio == 'Новая биография' and user.email == 'testuser@yamdb.fake'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_review_author_from_claims(self, client, admin_client, user):
+        from .common import create_titles
+
+        titles, _, _ = create_titles(admin_client)
+        fast_client = claims_client(client, user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = fast_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        review_id = response.json()['id']
+        response = fast_client.patch(f'{url}{review_id}/', data={'text': 'Правка'})
+        assert response.status_code == 200, (
+            'Проверьте, что автор из полей токена может менять свой отзыв'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_stale_claims_revoked(self, client, admin):
+        fast_client = claims_client(client, admin)
+        assert fast_client.get('/api/v1/users/').status_code == 200
+        admin.role = 'user'
+        admin.save()
+        assert fast_client.get('/api/v1/users/').status_code == 403, (
+            'Проверьте, что после смены роли токен со старой ролью не даёт прежних прав'
+        )
+        admin.is_active = False
+        admin.save()
+        assert fast_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен отключённого пользователя не принимается'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_revoked_in_other_worker(self, client, admin, django_assert_num_queries):
+        import multiprocessing
+
+        from api.authentication import revoke_claims
+
+        fast_client = claims_client(client, admin)
+        with django_assert_num_queries(2):
+            assert fast_client.get('/api/v1/users/').status_code == 200
+        # Пользователя изменил другой воркер: сбросить он может только
+        # свой кэш, кэш этого процесса не меняется.
+        context = multiprocessing.get_context('fork')
+        process = context.Process(target=revoke_claims, args=(admin.pk,))
+        process.start()
+        process.join()
+        assert process.exitcode == 0
+        with django_assert_num_queries(3):
+            response = fast_client.get('/api/v1/users/')
+        assert response.status_code == 200, (
+            'Проверьте, что после изменения пользователя в другом процессе '
+            'он снова загружается из базы'
+        )
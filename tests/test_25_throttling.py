@@ -0,0 +1,93 @@
+import multiprocessing
+import sqlite3
+
+import pytest
+
+
+def hit_many(key, count, results):
+    from api.throttling import store
+
+    results.put([store.hit(key, 60, 30.0)[0] for _ in range(count)])
+
+
+class Test25Throttling:
+
+    def test_01_fixed_window(self, throttle_db):
+        from api.throttling import ThrottleStore
+
+        first, second = ThrottleStore(), ThrottleStore()
+        assert first.hit('anon:1', 60, 125.0) == (1, 180)
+        assert second.hit('anon:1', 60, 130.0) == (2, 180), (
+            'Проверьте, что счётчик общий для всех соединений с THROTTLE_DB'
+        )
+        assert second.hit('anon:2', 60, 130.0) == (1, 180)
+        assert first.hit('anon:1', 60, 185.0) == (1, 240), (
+            'Проверьте, что в новом окне счёт начинается заново'
+        )
+
+    def test_02_processes_share_counter(self, throttle_db):
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        processes = [
+            context.Process(target=hit_many, args=('user:1', 25, results))
+            for _ in range(4)
+        ]
+        for process in processes:
+            process.start()
+        hits = sorted(value for _ in processes for value in results.get())
+        for process in processes:
+            process.join()
+        assert hits == list(range(1, 101)), (
+            'Проверьте, что процессы видят общий счётчик и запросы не теряются'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_api_limit(self, client, monkeypatch):
+        from api.throttling import SharedAnonRateThrottle
+
+        monkeypatch.setattr(
+            SharedAnonRateThrottle, 'THROTTLE_RATES', {'anon': '3/minute'})
+        for _ in range(3):
+            assert client.get('/api/v1/genres/').status_code == 200
+        response = client.get('/api/v1/genres/')
+        assert response.status_code == 429, (
+            'Проверьте, что анонимные запросы сверх лимита отклоняются'
+        )
+        assert 0 < int(response['Retry-After']) <= 60
+
+    def test_04_purge_expired_windows(self, throttle_db, settings):
+        from api.throttling import ThrottleStore
+
+        settings.THROTTLE_PURGE_INTERVAL = 60
+        store = ThrottleStore()
+        for number in range(5):
+            store.hit(f'anon:{number}', 60, 125.0)
+        store.hit('anon:0', 60, 170.0)
+        count = 'SELECT COUNT(*) FROM throttle_window'
+        assert store.connect().execute(count).fetchone() == (5,)
+        store.hit('anon:9', 60, 200.0)
+        assert store.connect().execute(count).fetchone() == (1,), (
+            'Проверьте, что счётчики закончившихся окон удаляются'
+        )
+        assert store.hit('anon:0', 60, 210.0) == (1, 240)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_fail_open(self, client, monkeypatch, caplog):
+        from api import throttling
+
+        def locked(*args):
+            raise sqlite3.OperationalError('database is locked')
+
+        monkeypatch.setattr(
+            throttling.SharedAnonRateThrottle, 'THROTTLE_RATES',
+            {'anon': '1/minute'})
+        monkeypatch.setattr(throttling.store, 'hit', locked)
+        for _ in range(3):
+            assert client.get('/api/v1/genres/').status_code == 200, (
+                'Проверьте, что при недоступном счётчике запросы '
+                'не отклоняются'
+            )
+        assert any(record.name == 'api.throttling'
+                   for record in caplog.records), (
+            'Проверьте, что ошибка счётчика записывается в лог'
+        )
@@ -0,0 +1,70 @@
+import datetime
+import decimal
+import io
+from collections import OrderedDict
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+DATA = OrderedDict((
+    ('name', 'Поворот туда '),
+    ('pub_date', timezone.make_aware(datetime.datetime(2021, 5, 1, 12, 30, 15, 123456))),
+    ('score', decimal.Decimal('7.50')),
+    ('message', gettext_lazy('Not found.')),
+    ('genre', [OrderedDict((('name', 'Ужасы'), ('slug', 'horror')))]),
+    ('rating', None),
+    (1, True),
+))
+
+
+class Test26JSONRenderer:
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_01_same_output(self, monkeypatch, use_orjson):
+        from api import renderers
+        from api.renderers import FastJSONRenderer
+
+        if not use_orjson:
+            monkeypatch.setattr(renderers, 'orjson', None)
+        assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA), (
+            'Проверьте, что быстрый рендерер выдаёт тот же JSON, что и JSONRenderer'
+        )
+        assert FastJSONRenderer().render(None) == b''
+        indented = FastJSONRenderer().render(DATA, 'application/json; indent=2')
+        assert indented == JSONRenderer().render(DATA, 'application/json; indent=2')
+
+    @pytest.mark.parametrize('use_orjson', [True, False])
+    def test_02_parser(self, monkeypatch, use_orjson):
+        from rest_framework.exceptions import ParseError
+
+        from api import parsers
+        from api.parsers import FastJSONParser
+
+        if not use_orjson:
+            monkeypatch.setattr(parsers, 'orjson', None)
+        body = '{"name": "Ужасы", "slug": "horror", "ids": [1, 2]}'.encode()
+        assert FastJSONParser().parse(io.BytesIO(body)) == {
+            'name': 'Ужасы', 'slug': 'horror', 'ids': [1, 2],
+        }
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"name": '))
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_api_json(self, client, admin_client):
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильм', 'slug': 'films'}, format='json')
+        assert response.status_code == 201, (
+            'Проверьте, что API принимает JSON через быстрый парсер'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/', data='{"name": ', content_type='application/json')
+        assert response.status_code == 400
+        response = client.get('/api/v1/categories/', HTTP_ACCEPT='application/json')
+        assert response['Content-Type'] == 'application/json'
+        assert response.json()['results'] == [{'name': 'Фильм', 'slug': 'films'}]
+        response = client.get('/api/v1/categories/', HTTP_ACCEPT='text/html')
+        assert response['Content-Type'].startswith('text/html'), (
+            'Проверьте, что браузерная версия API доступна через согласование формата'
+        )
@@ -0,0 +1,76 @@
+import pytest
+
+from .common import create_comments
+
+
+def create_catalogue(admin_client, admin):
+    from reviews.models import Title
+
+    comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+    # произведение без категории и описания
+    title = Title.objects.create(name='Без категории', year=1999)
+    title.genre.set(Title.objects.get(id=titles[0]['id']).genre.all())
+    return comments, reviews, titles
+
+
+def responses(admin_client, settings, url):
+    settings.FAST_READ_SERIALIZERS = True
+    fast = admin_client.get(url)
+    settings.FAST_READ_SERIALIZERS = False
+    slow = admin_client.get(url)
+    assert slow.status_code == 200
+    return fast, slow
+
+
+class Test27ValuesSerializers:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_same_bytes(self, admin_client, admin, settings):
+        comments, reviews, titles = create_catalogue(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        urls = [
+            '/api/v1/titles/',
+            '/api/v1/titles/?page_size=100&ordering=-year',
+            '/api/v1/titles/?genre=horror',
+            '/api/v1/titles/?category=films&ordering=genre',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/?pagination=cursor&page_size=2',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/?pagination=cursor&page_size=1',
+        ]
+        for url in urls:
+            fast, slow = responses(admin_client, settings, url)
+            assert fast.content == slow.content, (
+                f'Проверьте, что `{url}` в режиме FAST_READ_SERIALIZERS '
+                'отдаёт те же байты, что и сериалайзеры'
+            )
+        fast, _ = responses(admin_client, settings, urls[0])
+        assert any(title['category'] is None for title in fast.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_plan_matches_serializer(self, admin_client, admin):
+        from api.serializers import (CommentSerializer, ReviewSerializer,
+                                     TitleSerializer)
+        from api.values import ValuesPlan
+        from reviews.models import Comment, Review, Title
+
+        create_catalogue(admin_client, admin)
+        for serializer_class, queryset in (
+            (TitleSerializer, Title.objects.select_related('category').prefetch_related('genre')),
+            (ReviewSerializer, Review.objects.select_related('author')),
+            (CommentSerializer, Comment.objects.select_related('author')),
+        ):
+            plan = ValuesPlan.for_serializer(serializer_class)
+            expected = serializer_class(queryset, many=True).data
+            assert plan.serialize(plan.values(queryset)) == expected, (
+                f'Проверьте, что план {serializer_class.__name__} совпадает с сериалайзером'
+            )
+
+    def test_03_unsupported_fields(self):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from api.serializers import TitleStatsSerializer
+        from api.values import ValuesPlan
+
+        with pytest.raises(ImproperlyConfigured):
+            ValuesPlan(TitleStatsSerializer())
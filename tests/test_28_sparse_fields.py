@@ -0,0 +1,153 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_comments
+
+
+def selects(context):
+    """SELECT-запросы без загрузки пользователя сессии."""
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT')
+        and not query['sql'].startswith('SELECT "reviews_user"')
+    ]
+
+
+class Test28SparseFields:
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('fast', [True, False])
+    def test_01_title_list_fields(self, admin_client, admin, settings, fast):
+        settings.FAST_READ_SERIALIZERS = fast
+        create_comments(admin_client, admin)
+        full = admin_client.get('/api/v1/titles/?ordering=name').json()
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(
+                '/api/v1/titles/?ordering=name&fields=rating,name,id')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [list(title) for title in results] == [
+            ['id', 'name', 'rating'] for _ in results], (
+            'Проверьте, что `?fields=` оставляет в ответе только '
+            'запрошенные поля в порядке сериалайзера'
+        )
+        assert results == [
+            {name: title[name] for name in ('id', 'name', 'rating')}
+            for title in full['results']
+        ]
+        sql = selects(context)
+        assert not any('genre' in query for query in sql), (
+            'Проверьте, что без поля `genre` жанры не загружаются'
+        )
+        assert not any('"description"' in query for query in sql), (
+            'Проверьте, что запрос не выбирает ненужные столбцы'
+        )
+        assert not any('reviews_category' in query for query in sql)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_title_detail_omit(self, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        title_id = titles[0]['id']
+        full = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(
+                f'/api/v1/titles/{title_id}/?omit=genre,description')
+        assert response.status_code == 200
+        expected = dict(full)
+        del expected['genre'], expected['description']
+        assert response.json() == expected, (
+            'Проверьте, что `?omit=` убирает поля из ответа'
+        )
+        sql = selects(context)
+        assert len(sql) == 1 and 'reviews_category' in sql[0]
+        assert '"description"' not in sql[0]
+
+        response = admin_client.get(
+            '/api/v1/titles/top/?fields=id,weighted_rating')
+        assert response.status_code == 200
+        top = response.json()
+        assert top and all(list(title) == ['id', 'weighted_rating']
+                           for title in top)
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('fast', [True, False])
+    def test_03_reviews_and_comments(self, admin_client, admin, settings, fast):
+        settings.FAST_READ_SERIALIZERS = fast
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(f'{url}?fields=id,score')
+        assert response.status_code == 200
+        assert all(list(review) == ['id', 'score']
+                   for review in response.json()['results']), (
+            'Проверьте, что `?fields=` работает для отзывов'
+        )
+        assert not any('"text"' in query or 'reviews_user' in query
+                       for query in selects(context))
+
+        response = admin_client.get(f'{url}{review_id}/?omit=text')
+        assert list(response.json()) == ['id', 'author', 'score', 'pub_date']
+
+        response = admin_client.get(
+            f'{url}{review_id}/comments/?pagination=cursor&omit=text,pub_date')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert results and all(list(comment) == ['id', 'author']
+                               for comment in results), (
+            'Проверьте, что `?omit=` работает для комментариев'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    @pytest.mark.parametrize('fast', [True, False])
+    def test_04_cursor_without_position_fields(self, admin_client, admin,
+                                               settings, fast):
+        settings.FAST_READ_SERIALIZERS = fast
+        _, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        for url in (reviews_url, f'{reviews_url}{review_id}/comments/'):
+            full = admin_client.get(
+                f'{url}?pagination=cursor&page_size=1').json()
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.get(
+                    f'{url}?pagination=cursor&page_size=1&fields=text')
+            assert response.status_code == 200, (
+                'Проверьте, что курсорная пагинация работает с `?fields=` '
+                'без полей курсора'
+            )
+            data = response.json()
+            assert data['results'] == [
+                {'text': item['text']} for item in full['results']]
+            assert data['next'], (
+                'Проверьте, что ссылка на следующую страницу строится '
+                'без полей курсора в ответе'
+            )
+            assert len(selects(context)) == 1, (
+                'Проверьте, что поля курсора выбираются тем же запросом'
+            )
+            response = admin_client.get(data['next'])
+            assert response.status_code == 200
+            assert response.json()['results'] and all(
+                list(item) == ['text'] for item in response.json()['results'])
+
+    @pytest.mark.django_db(transaction=True)
+    def test_05_invalid_fields(self, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        response = admin_client.get('/api/v1/titles/?fields=id,password')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в `?fields=` возвращает 400'
+        )
+        assert 'fields' in response.json()
+        response = admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/?fields=name&omit=name')
+        assert response.status_code == 400
+        response = admin_client.post(
+            '/api/v1/titles/?fields=id',
+            data={'name': 'Новое', 'year': 2000, 'genre': ['horror'],
+                  'category': 'films'})
+        assert response.status_code == 201
+        assert 'name' in response.json(), (
+            'Проверьте, что `?fields=` не влияет на запись'
+        )